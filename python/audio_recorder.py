@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """
 音频录制模块
-采用临时文件落盘与块队列，兼顾内存占用与实时分段需求
+采用预分配的复用缓冲区与块队列，兼顾分配开销与实时分段需求；
+开启 LOG_AUDIO_FILES 时额外落盘为 WAV 便于调试
 """
 
-import os
-import queue
+import struct
 import tempfile
 import wave
 from pathlib import Path
-from typing import Optional, Callable
+from typing import BinaryIO, Callable, Optional, Tuple
 import threading
 
 import numpy as np
@@ -17,6 +17,71 @@ import sounddevice as sd
 
 import config
 
+# 输入流每次回调的默认帧数
+_DEFAULT_BLOCK_FRAMES = 1024
+# 调试 WAV 写入线程的批量落盘间隔（秒）
+_WAV_FLUSH_INTERVAL = 0.25
+# 调试 WAV 文件的写缓冲大小
+_WAV_BUFFER_SIZE = 1 << 20
+# 16-bit PCM WAV 文件头（RIFF/fmt/data 共 44 字节），两个长度字段在关闭时回填
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+_WAV_RIFF_SIZE_OFFSET = 4
+_WAV_DATA_SIZE_OFFSET = 40
+
+
+class SPSCRing:
+    """单生产者/单消费者音频块环形缓冲
+
+    槽位一次性预分配，生产者（音频回调）只写 head、消费者只写 tail，两端都不加锁；
+    写满时直接覆盖最旧的块，消费者读取时检测并跳过已被覆盖的块
+    """
+
+    def __init__(self, capacity: int, block_shape: Tuple[int, ...]):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._size = size
+        self._mask = size - 1
+        self._slots = [np.zeros(block_shape, dtype=np.float32) for _ in range(size)]
+        self._lengths = [0] * size
+        self._head = 0
+        self._tail = 0
+
+    def push(self, block: np.ndarray) -> None:
+        """生产者：复制一块数据到下一个槽位（音频回调中调用，不分配内存）"""
+        head = self._head
+        index = head & self._mask
+        count = len(block)
+        slot = self._slots[index]
+        if count > len(slot):
+            slot = self._slots[index] = np.empty((count,) + slot.shape[1:], dtype=np.float32)
+        slot[:count] = block
+        self._lengths[index] = count
+        self._head = head + 1
+
+    def pop(self) -> Optional[np.ndarray]:
+        """消费者：取出最旧的有效块（返回副本），没有数据时返回 None"""
+        while True:
+            head = self._head
+            tail = self._tail
+            if tail >= head:
+                return None
+            # 生产者可能正在写 head 对应的槽位，只有 (head - size, head) 区间内的块可读
+            if head - tail >= self._size:
+                tail = head - self._size + 1
+            index = tail & self._mask
+            data = self._slots[index][:self._lengths[index]].copy()
+            if self._head - tail >= self._size:
+                # 复制期间该槽位被覆盖，跳过后重试
+                self._tail = tail + 1
+                continue
+            self._tail = tail + 1
+            return data
+
+    def clear(self) -> None:
+        """消费者侧丢弃所有未读块"""
+        self._tail = self._head
+
 
 class AudioRecorder:
     def __init__(self):
@@ -27,20 +92,38 @@ class AudioRecorder:
         self.buffer_duration = config.BUFFER_DURATION
 
         self.frames_per_chunk = max(1, int(self.sample_rate * self.chunk_duration))
+        # 输入流每次回调的帧数：PortAudio 只交付整块，块过大会丢失松开热键前的尾音、
+        # 并拉长实时 VAD 的取数间隔，因此与分段时长解耦并保持较小的默认值
+        block_frames = config.CALLBACK_BLOCK_FRAMES
+        if block_frames <= 0:
+            print(f"⚠️ CALLBACK_BLOCK_FRAMES={block_frames} 无效，改用 {_DEFAULT_BLOCK_FRAMES}")
+            block_frames = _DEFAULT_BLOCK_FRAMES
+        self.block_frames = block_frames
 
         # 录制状态
         self.is_recording = False
         self.stream = None
         self.chunk_callback: Optional[Callable[[np.ndarray], None]] = None
 
-        # 临时文件写入
+        # 预分配整段录音缓冲区（按最大录音时长），各次录音复用，仅移动写指针；
+        # np.empty 不会立即占用物理内存，只有实际写入的部分才会分配页面
+        max_frames = int(config.MAX_RECORDING_DURATION * self.sample_rate)
+        buf_shape = (max_frames,) if self.channels == 1 else (max_frames, self.channels)
+        self._buf = np.empty(buf_shape, dtype=np.float32)
+        self._write_idx = 0
+        self._overflow_warned = False
+
+        # 调试用临时文件写入
         self._temp_file_path: Optional[Path] = None
-        self._wave_writer: Optional[wave.Wave_write] = None
-        self._write_lock = threading.Lock()
+        self._wave_writer: Optional[BinaryIO] = None
+        self._wav_data_bytes = 0
+        # WAV 由后台线程从录音缓冲区批量转换落盘，音频回调线程不做磁盘 I/O
+        self._wav_thread: Optional[threading.Thread] = None
+        self._wav_stop = threading.Event()
 
-        # 队列用于实时模式消费音频块
-        max_queue = max(1, int(self.buffer_duration / max(self.chunk_duration, 0.01)) + 2)
-        self.chunk_queue: queue.Queue = queue.Queue(max_queue)
+        # 无锁环形缓冲用于实时模式消费音频块
+        max_blocks = max(1, int(self.buffer_duration * self.sample_rate / self.block_frames) + 2)
+        self._ring = SPSCRing(max_blocks, (self.block_frames,) + buf_shape[1:])
 
         # 统计数据
         self.total_frames = 0
@@ -66,11 +149,15 @@ class AudioRecorder:
         self._temp_file_path = Path(handle.name)
         handle.close()
 
-        writer = wave.open(str(self._temp_file_path), "wb")
-        writer.setnchannels(self.channels)
-        writer.setsampwidth(2)
-        writer.setframerate(self.sample_rate)
+        # 直接写 44 字节文件头 + 原始 PCM，绕开 wave 模块每次 writeframes 的头部维护开销
+        writer = open(self._temp_file_path, "wb", buffering=_WAV_BUFFER_SIZE)
+        block_align = self.channels * 2
+        writer.write(_WAV_HEADER.pack(
+            b"RIFF", 0, b"WAVE", b"fmt ", 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * block_align, block_align, 16, b"data", 0,
+        ))
         self._wave_writer = writer
+        self._wav_data_bytes = 0
         self.total_frames = 0
         self.chunk_counter = 0
 
@@ -78,42 +165,81 @@ class AudioRecorder:
         if status:
             print(f"音频流状态: {status}")
 
-        float_chunk = indata.copy()
-        if self.channels == 1:
-            float_payload = float_chunk[:, 0]
-        else:
-            float_payload = float_chunk
+        float_payload = indata[:, 0] if self.channels == 1 else indata
+
+        # indata 在回调返回后会被 PortAudio 复用：实时消费方经预分配的环形缓冲取数据，
+        # 只有注册了分段回调时才额外复制一份只读数据
+        self._ring.push(float_payload)
 
         if self.chunk_callback:
             try:
-                self.chunk_callback(float_payload.copy())
+                payload = float_payload.copy()
+                payload.setflags(write=False)
+                self.chunk_callback(payload)
             except Exception as exc:
                 print(f"音频分段回调错误: {exc}")
 
-        try:
-            self.chunk_queue.put_nowait(float_payload.copy())
-        except queue.Full:
-            try:
-                self.chunk_queue.get_nowait()
-            except queue.Empty:
-                pass
-            try:
-                self.chunk_queue.put_nowait(float_payload.copy())
-            except queue.Full:
-                pass
-
-        int_chunk = np.clip(float_payload, -1.0, 1.0)
-        int_chunk = (int_chunk * 32767).astype(np.int16)
-
-        if self.channels > 1 and int_chunk.ndim == 1:
-            int_chunk = int_chunk.reshape(-1, self.channels)
-
-        with self._write_lock:
-            if self._wave_writer:
-                self._wave_writer.writeframes(int_chunk.tobytes())
-                self.total_frames += len(int_chunk)
+        # 回调是写指针的唯一写入方：先写数据再推进指针，WAV 线程只读取指针之前的部分
+        start = self._write_idx
+        count = min(len(float_payload), len(self._buf) - start)
+        if count < len(float_payload) and not self._overflow_warned:
+            self._overflow_warned = True
+            print("⚠️ 录音已达到最大时长，后续音频将被丢弃")
+        if count > 0:
+            np.clip(float_payload[:count], -1.0, 1.0, out=self._buf[start:start + count])
+            self._write_idx = start + count
+            self.total_frames = self._write_idx
         self.chunk_counter += 1
 
+    def _drain_to_wav(self) -> None:
+        """WAV 写入线程：定期把缓冲区中新录入的部分转换为 int16 并批量追加到文件"""
+        writer = self._wave_writer
+        written = 0
+        # int16 暂存区随批量大小按需增长并在整次录音中复用
+        scratch = np.empty((0,) + self._buf.shape[1:], dtype=np.int16)
+        while writer is not None:
+            stopping = self._wav_stop.wait(_WAV_FLUSH_INTERVAL)
+            end = self._write_idx
+            if end > written:
+                count = end - written
+                if count > len(scratch):
+                    scratch = np.empty((count,) + self._buf.shape[1:], dtype=np.int16)
+                # 数据已在回调中裁剪到 [-1, 1]：一次乘法直接写入 int16，不产生浮点临时数组
+                int_chunk = scratch[:count]
+                np.multiply(self._buf[written:end], 32767, out=int_chunk, casting="unsafe")
+                try:
+                    writer.write(int_chunk.data)
+                except Exception as exc:
+                    print(f"写入调试录音文件失败: {exc}")
+                    return
+                written = end
+                self._wav_data_bytes += int_chunk.nbytes
+            if stopping:
+                return
+
+    def _close_wav_writer(self) -> None:
+        """停止 WAV 写入线程（写完剩余数据）并关闭文件"""
+        thread = self._wav_thread
+        self._wav_thread = None
+        if thread is not None:
+            self._wav_stop.set()
+            thread.join()
+        writer = self._wave_writer
+        self._wave_writer = None
+        if writer is None:
+            return
+        try:
+            # 回填 RIFF 与 data 块长度
+            data_bytes = self._wav_data_bytes
+            writer.seek(_WAV_RIFF_SIZE_OFFSET)
+            writer.write(struct.pack("<I", 36 + data_bytes))
+            writer.seek(_WAV_DATA_SIZE_OFFSET)
+            writer.write(struct.pack("<I", data_bytes))
+        except Exception as exc:
+            print(f"写入调试录音文件失败: {exc}")
+        finally:
+            writer.close()
+
     def start_recording(self, chunk_callback: Optional[Callable[[np.ndarray], None]] = None) -> bool:
         """开始录制音频"""
         if self.is_recording:
@@ -121,25 +247,29 @@ class AudioRecorder:
             return False
 
         self.chunk_callback = chunk_callback
+        self._ring.clear()
 
-        while not self.chunk_queue.empty():
-            try:
-                self.chunk_queue.get_nowait()
-            except queue.Empty:
-                break
+        self._write_idx = 0
+        self.total_frames = 0
+        self.chunk_counter = 0
+        self._overflow_warned = False
 
-        try:
-            self._allocate_writer()
-        except Exception as exc:
-            print(f"创建临时录音文件失败: {exc}")
-            return False
+        if config.LOG_AUDIO_FILES:
+            try:
+                self._allocate_writer()
+                self._wav_stop.clear()
+                self._wav_thread = threading.Thread(target=self._drain_to_wav, name="WavWriter", daemon=True)
+                self._wav_thread.start()
+            except Exception as exc:
+                print(f"创建调试录音文件失败: {exc}")
 
         try:
             self.stream = sd.InputStream(
                 channels=self.channels,
                 samplerate=self.sample_rate,
                 callback=self._audio_callback,
-                blocksize=1024,
+                blocksize=self.block_frames,
+                latency="low",
                 dtype=np.float32,
             )
             self.stream.start()
@@ -149,17 +279,18 @@ class AudioRecorder:
         except Exception as exc:
             print(f"启动录制失败: {exc}")
             self.is_recording = False
-            with self._write_lock:
-                if self._wave_writer:
-                    self._wave_writer.close()
-                self._wave_writer = None
+            self._close_wav_writer()
             if self._temp_file_path and self._temp_file_path.exists():
                 self._temp_file_path.unlink(missing_ok=True)  # type: ignore[arg-type]
             self._temp_file_path = None
             return False
 
     def stop_recording(self) -> Optional[np.ndarray]:
-        """停止录制并返回完整的音频数据"""
+        """停止录制并返回完整的音频数据
+
+        返回值是复用缓冲区的切片视图（零拷贝），下一次 start_recording 后会被覆盖，
+        调用方需在开始新录音前完成消费或自行复制
+        """
         if not self.is_recording:
             print("当前未在录制")
             return None
@@ -172,56 +303,61 @@ class AudioRecorder:
             self.stream.close()
             self.stream = None
 
-        with self._write_lock:
-            if self._wave_writer:
-                self._wave_writer.close()
-            self._wave_writer = None
+        # 流已停止，回调不会再推进写指针
+        frame_count = self._write_idx
+        self._close_wav_writer()
 
         temp_path = self._temp_file_path
         self._temp_file_path = None
-
-        if not temp_path or not temp_path.exists():
-            print("未录制到有效音频数据")
-            return None
+        if temp_path:
+            print(f"📁 录音文件保存在: {temp_path}")
 
         try:
-            with wave.open(str(temp_path), "rb") as reader:
-                frame_count = reader.getnframes()
-                raw = reader.readframes(frame_count)
-
-            audio_int16 = np.frombuffer(raw, dtype=np.int16)
-            if self.channels > 1:
-                audio_int16 = audio_int16.reshape(-1, self.channels)
-            audio_float = audio_int16.astype(np.float32) / 32767.0
-            if self.channels == 1:
-                audio_float = audio_float.reshape(-1)
-
-            duration = len(audio_float) / float(self.sample_rate)
+            if frame_count == 0:
+                print("未录制到有效音频数据")
+                return None
+
+            audio_float = self._buf[:frame_count]
+
+            duration = frame_count / float(self.sample_rate)
             print(f"录制完成，音频长度: {duration:.2f} 秒")
-            print(f"总帧数: {len(audio_float)}")
+            print(f"总帧数: {frame_count}")
 
-            self._last_total_frames = len(audio_float)
+            self._last_total_frames = frame_count
             self._last_chunk_count = self.chunk_counter
 
-            if not config.LOG_AUDIO_FILES:
-                try:
-                    temp_path.unlink()
-                except OSError:
-                    pass
-            else:
-                print(f"📁 录音文件保存在: {temp_path}")
-
             return audio_float
         finally:
             self.total_frames = 0
             self.chunk_counter = 0
 
+    def discard_recording(self) -> None:
+        """停止录制并丢弃本次录音（不读取缓冲区、不保留调试文件）"""
+        if not self.is_recording:
+            return
+
+        self.is_recording = False
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+        self._close_wav_writer()
+        self._write_idx = 0
+
+        temp_path = self._temp_file_path
+        self._temp_file_path = None
+        if temp_path:
+            temp_path.unlink(missing_ok=True)
+
+        self._last_total_frames = 0
+        self._last_chunk_count = self.chunk_counter
+        self.total_frames = 0
+        self.chunk_counter = 0
+
     def get_latest_audio_chunk(self) -> Optional[np.ndarray]:
         """获取最新音频块供 VAD 消费"""
-        try:
-            return self.chunk_queue.get_nowait()
-        except queue.Empty:
-            return None
+        return self._ring.pop()
 
     def get_recording_stats(self) -> dict:
         """返回最近一次录音的统计信息"""
@@ -11,6 +11,7 @@ import queue
 import tempfile
 import threading
 import time
+import traceback
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -151,7 +152,11 @@ class AudioRetryManager:
         fd, temp_path = tempfile.mkstemp(prefix=f"{task_id}_", suffix=".npy", dir=str(audio_dir))
         os.close(fd)
 
-        safe_audio = audio_data.astype(np.float32, copy=True)
+        # int16 数据原样落盘（体积减半），其余格式统一为 float32；不做额外拷贝
+        if audio_data.dtype == np.int16:
+            safe_audio = np.ascontiguousarray(audio_data)
+        else:
+            safe_audio = np.ascontiguousarray(audio_data, dtype=np.float32)
         np.save(temp_path, safe_audio, allow_pickle=False)
 
         slice_length = min(len(safe_audio), int(config.SAMPLE_RATE * 2))
@@ -281,7 +286,6 @@ class AudioRetryManager:
             except Exception as e:
                 print(f"❌ 工作线程异常: {e}")
                 if config.DEBUG_MODE:
-                    import traceback
                     traceback.print_exc()
     
     def _retry_loop(self):
@@ -330,7 +334,6 @@ class AudioRetryManager:
             except Exception as e:
                 print(f"❌ 重试线程异常: {e}")
                 if config.DEBUG_MODE:
-                    import traceback
                     traceback.print_exc()
                 time.sleep(1.0)
     
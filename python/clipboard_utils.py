@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+剪贴板工具模块
+导入时按平台绑定一次剪贴板后端：macOS 直接调用 AppKit NSPasteboard（进程内完成，
+不再每次 fork pbcopy/pbpaste），其他平台或 AppKit 不可用时回退到 pyperclip
+"""
+
+import sys
+from typing import Callable, Optional
+
+import pyperclip
+
+_copy_impl: Callable[[str], None] = pyperclip.copy
+_paste_impl: Callable[[], Optional[str]] = pyperclip.paste
+BACKEND = "pyperclip"
+
+if sys.platform == "darwin":
+    try:
+        from AppKit import NSPasteboard, NSStringPboardType  # type: ignore
+
+        _pasteboard = NSPasteboard.generalPasteboard()
+
+        def _appkit_copy(text: str) -> None:
+            _pasteboard.clearContents()
+            if not _pasteboard.setString_forType_(text, NSStringPboardType):
+                raise RuntimeError("NSPasteboard 写入失败")
+
+        def _appkit_paste() -> Optional[str]:
+            return _pasteboard.stringForType_(NSStringPboardType)
+
+        _copy_impl = _appkit_copy
+        _paste_impl = _appkit_paste
+        BACKEND = "appkit"
+    except Exception:  # pragma: no cover - 未安装 pyobjc AppKit 时回退
+        pass
+
+
+def copy_text(text: str) -> None:
+    """写入剪贴板，失败时抛出异常由调用方处理"""
+    _copy_impl(text)
+
+
+def paste_text() -> Optional[str]:
+    """读取剪贴板文本"""
+    return _paste_impl()
@@ -22,6 +22,7 @@ SAMPLE_RATE = 16000  # 音频采样率
 CHANNELS = 1  # 单声道0
 CHUNK_DURATION = 1.0  # 分段时长（秒）
 BUFFER_DURATION = 30.0  # 缓冲区时长（秒）
+CALLBACK_BLOCK_FRAMES = 1024  # 输入流每次回调的帧数（过大会丢失尾音并拖慢实时 VAD）
 
 # 回归测试默认录音路径（可通过环境变量覆盖）
 REGRESSION_AUDIO_PATH = Path(
@@ -85,6 +86,8 @@ DICTIONARY_MAX_WEIGHT = 0.5  # 最大权重影响（避免过度替换）
 
 # Gemini 纠错配置
 ENABLE_GEMINI_CORRECTION = False  # 默认直接在转录阶段完成润色，可按需开启二次纠错
+MIN_CORRECTION_LENGTH = 8  # 短于该字符数的文本跳过二次纠错
+CORRECTION_CACHE_SIZE = 512  # 纠错结果 LRU 缓存条目数，0 表示禁用
 GEMINI_MODEL = "gemini-2.5-flash-lite"  # Gemini 纠错模型
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')  # 从环境变量读取API密钥
 
@@ -126,6 +129,8 @@ GEMINI_THINKING_OPTIONS = [
 GEMINI_AUDIO_LANGUAGE = "zh"  # 音频语言设置
 GEMINI_AUDIO_MAX_SIZE = 20 * 1024 * 1024  # 最大音频文件大小 20MB
 GEMINI_AUDIO_FORMATS = ["wav", "mp3", "m4a", "flac"]  # 支持的音频格式
+GEMINI_UPLOAD_AUDIO_FORMAT = os.getenv('GEMINI_UPLOAD_AUDIO_FORMAT', 'flac')  # 上传编码: wav / flac / opus
+GEMINI_UPLOAD_ENCODE_MIN_SECONDS = 3.0  # 短于该时长的音频直接上传 WAV，省去编码开销
 
 # Gemini 转录提示词
 
@@ -163,6 +168,9 @@ GEMINI_AUDIO_COMPRESSION_ENABLED = True  # 启用音频压缩
 GEMINI_PARALLEL_PROCESSING_ENABLED = True  # 启用并行处理
 GEMINI_CHUNK_SIZE_SECONDS = 60  # 分片大小（秒）
 GEMINI_MAX_PARALLEL_CHUNKS = 3  # 最大并行处理的分片数
+GEMINI_CONTEXT_CACHE_ENABLED = True  # 将提示词静态前缀（词典/纠错示例）放入 Gemini 上下文缓存
+GEMINI_CONTEXT_CACHE_TTL = 3600  # 上下文缓存有效期（秒）
+GEMINI_CONTEXT_CACHE_REFRESH_INTERVAL = 1800  # 上下文缓存续期间隔（秒）
 
 # ==================== 语音活动检测 (VAD) 配置 ====================
 
@@ -195,6 +203,7 @@ TEXT_INPUT_METHOD = "clipboard"        # 默认输入方法: "direct_type" | "cl
 TEXT_INPUT_DELAY = 0.1                   # 输入延迟（秒）
 TEXT_INPUT_CLIPBOARD_BACKUP = True       # 是否备份到剪贴板
 TEXT_INPUT_CHECK_PERMISSIONS = True      # 启动时检查权限
+TEXT_INPUT_PASTE_CHUNK_SIZE = 16384      # 超长文本按该字符数分块粘贴（0 表示不分块），可按系统剪贴板表现调整
 AUTO_PASTE_ENABLED = True                # 处理完成后自动粘贴到光标位置
 
 # ==================== 纠错记忆配置 ====================
@@ -207,6 +216,7 @@ CORRECTION_MIN_CHARS_IGNORE = 3          # 修订文本长度 <= 此值时忽略
 CORRECTION_AUTO_ACCEPT_THRESHOLD = 7     # 修订文本长度 <= 此值时直接接受（短文本更可能是有意修改）
 CORRECTION_MAX_LENGTH_GROWTH_RATIO = 1.6 # 修订文本长度不得超过原文的倍数（防止粘贴错误内容）
 CORRECTION_MAX_DIFF_RATIO = 0.5          # 允许的最大差异比例（0.5 = 50%，防止完全不相关的文本）
+CORRECTION_FLUSH_EVERY = 1               # 每累计 N 条纠错刷新一次文件缓冲；调大可减少写盘，但异常退出时最多丢失 N-1 条
 
 # ==================== Prompt 注入配置 ====================
 
@@ -277,12 +287,16 @@ ENABLE_VISUAL_NOTIFICATIONS = True  # 启用视觉提示（控制台闪烁）
 # 录音超时配置
 MAX_RECORDING_DURATION = 7200  # 最大录音时长（秒），默认2小时
 WARNING_RECORDING_DURATION = 6000  # 警告时长（秒），默认100分钟（录音1小时40分钟时提醒）
-TIMEOUT_CHECK_INTERVAL = 60  # 超时检查间隔（秒），每分钟检查一次
 
 # 调试配置
 DEBUG_MODE = True  # 开启调试模式
 LOG_AUDIO_FILES = False  # 是否保存音频文件用于调试
 
+# 转录结果缓存（按音频 SHA-256 复用转录与纠错结果）
+ENABLE_TRANSCRIPT_CACHE = True
+TRANSCRIPT_CACHE_FILE = PROJECT_ROOT / "logs" / "tx_cache.db"
+TRANSCRIPT_CACHE_MAX_ENTRIES = 1000  # 超出后按最近使用时间淘汰
+
 
 # ==================== 配置验证 ====================
 
@@ -328,6 +342,9 @@ def validate_config() -> None:
     
     if CORRECTION_MAX_DIFF_RATIO < 0 or CORRECTION_MAX_DIFF_RATIO > 1:
         errors.append("CORRECTION_MAX_DIFF_RATIO 必须在 [0, 1] 范围内")
+
+    if CORRECTION_FLUSH_EVERY < 1:
+        errors.append("CORRECTION_FLUSH_EVERY 必须 >= 1")
     
     # 文件路径检查
     if not PROJECT_ROOT.exists():
@@ -6,58 +6,54 @@
 
 from __future__ import annotations
 
+import atexit
 import difflib
-import json
 import threading
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple
 
 from pynput import keyboard
 
 try:
-    import pyperclip  # type: ignore
+    # macOS 下经 AppKit 进程内读取剪贴板，避免每次热键都 fork pbpaste
+    from clipboard_utils import paste_text  # type: ignore
 except ImportError:  # pragma: no cover - 环境缺失时提示
-    pyperclip = None  # type: ignore
+    paste_text = None  # type: ignore
 
 import config
+from history_store import history_store
 
 
 # 文件路径配置
 CORRECTION_FILE = Path(config.PROJECT_ROOT) / "logs" / "corrections.txt"
-HISTORY_FILE = Path(config.PROJECT_ROOT) / "logs" / "history.json"
 
 # 从配置文件读取阈值
 MIN_CHARS_IGNORE = getattr(config, "CORRECTION_MIN_CHARS_IGNORE", 3)
 AUTO_ACCEPT_THRESHOLD = getattr(config, "CORRECTION_AUTO_ACCEPT_THRESHOLD", 7)
 MAX_LENGTH_GROWTH_RATIO = getattr(config, "CORRECTION_MAX_LENGTH_GROWTH_RATIO", 1.6)
 MAX_DIFF_RATIO = getattr(config, "CORRECTION_MAX_DIFF_RATIO", 0.5)
+# 每累计多少条纠错刷新一次文件缓冲（退出时总会刷新剩余内容）
+FLUSH_EVERY = max(1, config.CORRECTION_FLUSH_EVERY)
 
 # 线程安全的全局状态管理
 _hotkey_lock = threading.Lock()
 _hotkey_listener: Optional[keyboard.GlobalHotKeys] = None
 
+# 纠错文件句柄首次写入时打开并持续复用，避免每条记录都 open/close
+_correction_lock = threading.Lock()
+_correction_file: Optional[BinaryIO] = None
+_pending_entries = 0
+
 
 def _load_latest_history() -> Optional[str]:
-    """读取 history.json 中最新一条的文本。
+    """读取 history.jsonl 中最新一条的文本。
     
     Returns:
         Optional[str]: 最新历史记录的文本内容，如果不存在或出错则返回 None
     """
-    if not HISTORY_FILE.exists():
-        return None
-    
     try:
-        raw_text = HISTORY_FILE.read_text(encoding="utf-8")
-        if not raw_text.strip():
-            return None
-            
-        data = json.loads(raw_text)
-        
-        if not isinstance(data, list) or not data:
-            return None
-            
-        latest = data[-1]
-        if not isinstance(latest, dict):
+        latest = history_store.latest()
+        if latest is None:
             return None
             
         text = latest.get("text") or latest.get("final_text") or ""
@@ -65,16 +61,12 @@ def _load_latest_history() -> Optional[str]:
         
     except (OSError, PermissionError) as exc:
         if config.DEBUG_MODE:
-            print(f"⚠️ 无法访问 history.json: {exc}")
-        return None
-    except json.JSONDecodeError as exc:
-        if config.DEBUG_MODE:
-            print(f"⚠️ history.json 格式错误: {exc}")
+            print(f"⚠️ 无法访问 history.jsonl: {exc}")
         return None
     except Exception as exc:
         # 未预期的错误，保留日志但不中断
         if config.DEBUG_MODE:
-            print(f"⚠️ 读取 history.json 时发生未预期错误: {exc}")
+            print(f"⚠️ 读取 history.jsonl 时发生未预期错误: {exc}")
         return None
 
 
@@ -84,12 +76,12 @@ def _get_clipboard_text() -> Optional[str]:
     Returns:
         Optional[str]: 剪贴板文本内容，失败则返回 None
     """
-    if pyperclip is None:
+    if paste_text is None:
         print("⚠️ 当前环境未安装 pyperclip，无法读取剪贴板")
         return None
         
     try:
-        text = pyperclip.paste()
+        text = paste_text()
         if not isinstance(text, str):
             return None
         return text.strip()
@@ -129,10 +121,15 @@ def _should_accept(original: str, corrected: str) -> Tuple[bool, str]:
     if len(corrected) > len(original) * MAX_LENGTH_GROWTH_RATIO:
         return False, f"修订文本长度增长过大 (>{MAX_LENGTH_GROWTH_RATIO:.0%})"
 
-    # 计算差异比例
+    # 计算差异比例：先用 O(n) 的相似度上界快速排除，只有可能通过时才做完整匹配
+    min_ratio = 1.0 - MAX_DIFF_RATIO
     try:
-        ratio = difflib.SequenceMatcher(None, original, corrected).ratio()
-        diff_ratio = 1.0 - ratio
+        matcher = difflib.SequenceMatcher(None, original, corrected, autojunk=False)
+        for upper_bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+            bound = upper_bound()
+            if bound < min_ratio:
+                return False, f"改动比例过大 (>={1.0 - bound:.2%})"
+        diff_ratio = 1.0 - matcher.ratio()
     except Exception as exc:
         if config.DEBUG_MODE:
             print(f"⚠️ 计算文本相似度失败: {exc}")
@@ -155,8 +152,8 @@ def _append_correction(original: str, corrected: str) -> None:
         OSError: 文件写入失败
         PermissionError: 无写入权限
     """
-    CORRECTION_FILE.parent.mkdir(parents=True, exist_ok=True)
-    
+    global _correction_file, _pending_entries
+
     # 基本的内容验证
     if len(original) > 10000 or len(corrected) > 10000:
         raise ValueError("文本长度超过限制 (10000 字符)")
@@ -164,10 +161,31 @@ def _append_correction(original: str, corrected: str) -> None:
     entry = (
         f"原文：{original}\n"
         f"→ 修订：{corrected}\n\n"
-    )
-    
-    with CORRECTION_FILE.open("a", encoding="utf-8") as f:
-        f.write(entry)
+    ).encode("utf-8")
+
+    with _correction_lock:
+        if _correction_file is None:
+            CORRECTION_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _correction_file = CORRECTION_FILE.open("ab", buffering=1 << 15)
+        _correction_file.write(entry)
+        _pending_entries += 1
+        if _pending_entries >= FLUSH_EVERY:
+            _correction_file.flush()
+            _pending_entries = 0
+
+
+@atexit.register
+def _close_correction_file() -> None:
+    """进程退出时刷新并关闭纠错文件句柄"""
+    global _correction_file, _pending_entries
+    with _correction_lock:
+        if _correction_file is not None:
+            try:
+                _correction_file.close()
+            except OSError:
+                pass
+            _correction_file = None
+            _pending_entries = 0
 
 
 def capture_correction(
@@ -179,7 +197,7 @@ def capture_correction(
     """捕获并写入一次纠错。
     
     Args:
-        original_text: 可显式传入原文；若缺省则读取 history.json 最新记录
+        original_text: 可显式传入原文；若缺省则读取 history.jsonl 最新记录
         corrected_text: 可显式传入修订文本；若缺省则读取剪贴板内容
         verbose: 是否打印反馈信息
         
@@ -232,7 +250,7 @@ def start_hotkey_listener(hotkey: str) -> bool:
     """
     global _hotkey_listener
 
-    if pyperclip is None:
+    if paste_text is None:
         print("⚠️ 未安装 pyperclip，无法启用纠错记忆热键")
         return False
 
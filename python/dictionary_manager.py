@@ -6,10 +6,25 @@
 
 import re
 import difflib
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 import config
 
+# 分词：连续单词字符或单个标点
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+
+@dataclass(slots=True)
+class TranscriptSegment:
+    """转录片段（词典处理与纠错流程的统一数据结构）"""
+    text: str
+    start: float = 0.0
+    duration: float = 0.0
+    replacements: List[Dict[str, Any]] = field(default_factory=list)
+    gemini_corrected: bool = False
+
+
 class DictionaryManager:
     def __init__(self):
         """初始化词典管理器"""
@@ -261,7 +276,7 @@ class DictionaryManager:
         
         return None
     
-    def process_transcript(self, transcript: List[Dict]) -> List[Dict]:
+    def process_transcript(self, transcript: List[TranscriptSegment]) -> List[TranscriptSegment]:
         """
         处理转录结果，应用词典替换
         
@@ -277,13 +292,13 @@ class DictionaryManager:
         processed_transcript = []
         
         for entry in transcript:
-            original_text = entry.get('text', '').strip()
+            original_text = entry.text.strip()
             if not original_text:
                 processed_transcript.append(entry)
                 continue
             
             # 分词处理
-            words = re.findall(r'\w+|[^\w\s]', original_text)
+            words = _TOKEN_RE.findall(original_text)
             processed_words = []
             replacements = []  # 记录替换信息
             
@@ -313,15 +328,12 @@ class DictionaryManager:
             # 重建文本
             processed_text = ''.join(processed_words)
             
-            # 创建新的条目
-            new_entry = entry.copy()
-            new_entry['text'] = processed_text
-            
-            # 添加替换信息（可选）
-            if replacements and config.DEBUG_MODE:
-                new_entry['replacements'] = replacements
-            
-            processed_transcript.append(new_entry)
+            # 创建新的条目（始终保留替换信息，供纠错缓存判定与会话报告统计）
+            processed_transcript.append(replace(
+                entry,
+                text=processed_text,
+                replacements=replacements or entry.replacements,
+            ))
         
         return processed_transcript
     
@@ -368,14 +380,14 @@ if __name__ == "__main__":
     
     # 测试转录处理
     test_transcript = [
-        {'start': 0.0, 'duration': 2.0, 'text': '这是一个测师的Recat应用'},
-        {'start': 2.0, 'duration': 3.0, 'text': '使用javascript和pai进行开发'},
-        {'start': 5.0, 'duration': 2.0, 'text': '需要好的算发和数据苦'}
+        TranscriptSegment('这是一个测师的Recat应用', start=0.0, duration=2.0),
+        TranscriptSegment('使用javascript和pai进行开发', start=2.0, duration=3.0),
+        TranscriptSegment('需要好的算发和数据苦', start=5.0, duration=2.0),
     ]
     
     print(f"\n转录处理测试:")
     processed = manager.process_transcript(test_transcript)
-    for entry in processed:
-        print(f"  原文: {test_transcript[processed.index(entry)]['text']}")
-        print(f"  处理后: {entry['text']}")
+    for original, entry in zip(test_transcript, processed):
+        print(f"  原文: {original.text}")
+        print(f"  处理后: {entry.text}")
         print()
\ No newline at end of file
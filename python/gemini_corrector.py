@@ -6,6 +6,9 @@ Gemini纠错模块
 
 import hashlib
 import os
+import re
+import threading
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 
 import httpx
@@ -14,12 +17,25 @@ from google.genai import types
 
 import config
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize_cache_key(text: str) -> str:
+    """纠错缓存键：去首尾空白、小写、连续空白合并"""
+    return _WHITESPACE_RE.sub(' ', text.strip().lower())
+
+
 class GeminiCorrector:
     def __init__(self):
         """初始化Gemini纠错器"""
         self.api_key = config.GEMINI_API_KEY
         self.model = config.GEMINI_MODEL  # 使用配置文件中的模型设置
         self.is_ready = bool(self.api_key)
+
+        # 纠错结果 LRU 缓存（“好的”“下一个”等高频短句重复出现时免去 API 往返）
+        self._cache_size = getattr(config, "CORRECTION_CACHE_SIZE", 512)
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         if self.is_ready:
             try:
@@ -54,18 +70,30 @@ class GeminiCorrector:
             print("⚠️  Gemini API密钥未配置，将跳过后处理纠错")
             print(f"   请在.env文件中设置 GEMINI_API_KEY")
     
-    def correct_transcript(self, transcript_text: str) -> Optional[str]:
+    def correct_transcript(self, transcript_text: str, use_cache: bool = True) -> Optional[str]:
         """
         使用Gemini对转录文本进行纠错
         
         Args:
             transcript_text: 原始转录文本
+            use_cache: 是否查询/写入纠错结果缓存
             
         Returns:
             纠错后的文本，如果失败返回None
         """
         if not self.is_ready or not transcript_text.strip():
             return transcript_text
+
+        cache_key = _normalize_cache_key(transcript_text) if use_cache and self._cache_size > 0 else None
+        if cache_key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+            if cached is not None:
+                if config.DEBUG_MODE:
+                    print("♻️ 命中纠错缓存")
+                return cached
         
         try:
             # 构建提示词
@@ -73,6 +101,9 @@ class GeminiCorrector:
             
             # 调用新的Gemini API
             corrected_text = self._call_gemini_api_new(prompt)
+
+            if corrected_text and cache_key is not None:
+                self._store_cached(cache_key, corrected_text)
             
             if corrected_text and corrected_text.strip() != transcript_text.strip():
                 if config.DEBUG_MODE:
@@ -86,6 +117,13 @@ class GeminiCorrector:
             print(f"Gemini纠错失败: {e}")
             return transcript_text
     
+    def _store_cached(self, key: str, corrected_text: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = corrected_text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
     def _build_correction_prompt(self, text: str) -> str:
         """构建纠错提示词"""
         return config.GEMINI_CORRECTION_PROMPT.format(text=text)
@@ -5,9 +5,9 @@ Gemini 音频转录器
 """
 
 import concurrent.futures
+from collections import deque
 import hashlib
 import io
-import json
 import os
 import tempfile
 import threading
@@ -26,7 +26,29 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("⚠️  google-genai 未安装，请运行: uv add google-genai")
 
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDFILE_AVAILABLE = False
+
 import config
+from history_store import history_store
+
+# 上传编码格式 -> (soundfile format, subtype, MIME 类型)
+_UPLOAD_CODECS: Dict[str, Tuple[str, str, str]] = {
+    "flac": ("FLAC", "PCM_16", "audio/flac"),
+    "opus": ("OGG", "OPUS", "audio/ogg"),
+}
+
+# 上下文缓存已过期或被删除时，API 错误信息中出现的关键字（小写）
+_CACHE_MISSING_MARKERS = ("not found", "not_found", "expired", "404")
+
+
+def _is_context_cache_error(error_msg: str) -> bool:
+    """判断 API 错误是否由上下文缓存失效引起"""
+    lowered = error_msg.lower()
+    return "cache" in lowered and any(marker in lowered for marker in _CACHE_MISSING_MARKERS)
 
 
 class GeminiTranscriber:
@@ -38,8 +60,16 @@ class GeminiTranscriber:
         self.model = config.GEMINI_TRANSCRIPTION_MODEL  # 使用配置中的模型
         self.is_ready = False
         self.last_run_info: Dict[str, Any] = {}
-        self._prompt_cache: Optional[str] = None
+        self._prompt_cache: Optional[Tuple[str, str]] = None
         self._prompt_cache_mtime: Optional[Tuple[float, float]] = None
+        # Gemini 上下文缓存：缓存提示词静态前缀，请求时只发送音频与历史上下文
+        self._context_cache_lock = threading.Lock()
+        self._context_cache_name: Optional[str] = None
+        self._context_cache_prompt: Optional[str] = None
+        # 提示词构建（读取词典/纠错/历史文件）与音频编码并行进行
+        self._prep_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="PromptPrep"
+        )
         
         if not GEMINI_AVAILABLE:
             print("❌ Google Gen AI SDK 未安装")
@@ -90,7 +120,7 @@ class GeminiTranscriber:
         转录完整音频 - 优化版本支持多种策略
         
         Args:
-            audio_data: 音频数据 (numpy array)
+            audio_data: 音频数据 (numpy array，float32 或已量化的 int16)
             
         Returns:
             转录文本或 None
@@ -113,6 +143,8 @@ class GeminiTranscriber:
             "transcript_chars": 0,
             "api_attempts": 0,
             "payload_type": None,
+            "audio_format": None,
+            "encoding_ms": None,
             "chunks_total": 0,
             "chunks_success": 0,
         }
@@ -131,8 +163,10 @@ class GeminiTranscriber:
     def _transcribe_single_audio(self, audio_data: np.ndarray) -> Optional[str]:
         """处理短音频（≤30秒）"""
         try:
+            prompt_future = self._prep_executor.submit(self._build_prompt)
+
             # 创建压缩的音频数据
-            audio_bytes = self._create_compressed_audio_bytes(audio_data)
+            audio_bytes, mime_type = self._encode_upload_audio(audio_data)
             if not audio_bytes:
                 return None
             
@@ -142,9 +176,9 @@ class GeminiTranscriber:
             print(f"📁 压缩音频大小: {compressed_kb:.1f}KB")
 
             # 直接调用API，无需临时文件
-            prompt_text = self._build_prompt()
+            prompt_text = prompt_future.result()
 
-            transcript = self._call_gemini_audio_api_bytes(audio_bytes, prompt_text)
+            transcript = self._call_gemini_audio_api_bytes(audio_bytes, prompt_text, mime_type)
 
             if transcript:
                 self.last_run_info["transcript_chars"] = len(transcript)
@@ -162,6 +196,8 @@ class GeminiTranscriber:
     def _transcribe_compressed_audio(self, audio_data: np.ndarray) -> Optional[str]:
         """处理中等长度音频（30-120秒）- 使用音频压缩"""
         try:
+            prompt_future = self._prep_executor.submit(self._build_prompt)
+
             # 降采样以减少文件大小
             if config.SAMPLE_RATE > 16000:
                 # 降采样到16kHz
@@ -170,13 +206,14 @@ class GeminiTranscriber:
                     audio_data = audio_data[::downsample_factor]
                     print(f"📉 降采样: {config.SAMPLE_RATE}Hz → 16000Hz")
             
-            # 音量标准化
-            max_val = np.max(np.abs(audio_data))
+            # 音量标准化（兼容已量化的 int16 数据）
+            full_scale = 32767.0 if audio_data.dtype == np.int16 else 1.0
+            max_val = float(np.max(np.abs(audio_data, dtype=np.float32)))
             if max_val > 0:
-                audio_data = (audio_data / max_val * 0.9).astype(audio_data.dtype)
+                audio_data = (audio_data * (0.9 * full_scale / max_val)).astype(audio_data.dtype)
             
             # 创建压缩音频
-            audio_bytes = self._create_compressed_audio_bytes(audio_data, sample_rate=16000)
+            audio_bytes, mime_type = self._encode_upload_audio(audio_data, sample_rate=16000)
             if not audio_bytes:
                 return None
             
@@ -186,9 +223,9 @@ class GeminiTranscriber:
             print(f"📁 压缩音频大小: {compressed_kb:.1f}KB")
 
             # 调用API
-            prompt_text = self._build_prompt()
+            prompt_text = prompt_future.result()
 
-            transcript = self._call_gemini_audio_api_bytes(audio_bytes, prompt_text)
+            transcript = self._call_gemini_audio_api_bytes(audio_bytes, prompt_text, mime_type)
 
             if transcript:
                 self.last_run_info["transcript_chars"] = len(transcript)
@@ -206,6 +243,7 @@ class GeminiTranscriber:
     def _transcribe_chunked_audio(self, audio_data: np.ndarray) -> Optional[str]:
         """处理长音频（>120秒）- 分片并行处理"""
         try:
+            prompt_future = self._prep_executor.submit(self._build_prompt)
             chunk_size = 60 * config.SAMPLE_RATE  # 60秒分片
             chunks = []
             
@@ -220,7 +258,7 @@ class GeminiTranscriber:
             
             # 并行转录
             transcripts = []
-            prompt_text = self._build_prompt()
+            prompt_text = prompt_future.result()
             with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
                 future_to_chunk = {
                     executor.submit(self._transcribe_chunk, chunk_id, chunk_data, prompt_text): chunk_id 
@@ -259,12 +297,12 @@ class GeminiTranscriber:
         """转录单个音频分片"""
         try:
             # 压缩分片
-            audio_bytes = self._create_compressed_audio_bytes(chunk_data, sample_rate=16000)
+            audio_bytes, mime_type = self._encode_upload_audio(chunk_data, sample_rate=16000)
             if not audio_bytes:
                 return None
             
             # 调用API
-            return self._call_gemini_audio_api_bytes(audio_bytes, prompt_text)
+            return self._call_gemini_audio_api_bytes(audio_bytes, prompt_text, mime_type)
             
         except Exception as e:
             print(f"❌ 分片 {chunk_id} 处理失败: {e}")
@@ -299,27 +337,26 @@ class GeminiTranscriber:
         except Exception as exc:
             return False, str(exc)
     
-    def _call_gemini_audio_api_bytes(self, audio_bytes: bytes, prompt_text: Optional[str] = None) -> Optional[str]:
+    def _call_gemini_audio_api_bytes(self, audio_bytes: bytes, prompt_text: Optional[str] = None,
+                                     mime_type: str = "audio/wav") -> Optional[str]:
         """直接使用音频字节数据调用Gemini API"""
         for attempt in range(config.GEMINI_MAX_RETRIES):
+            cache_name = None
             try:
                 print(f"🔄 API调用尝试 {attempt + 1}/{config.GEMINI_MAX_RETRIES}")
                 
-                # 构建内容
+                # 构建内容：命中上下文缓存时只发送提示词增量部分
                 base_prompt = prompt_text or config.GEMINI_TRANSCRIPTION_PROMPT
-
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_text(text=base_prompt),
-                            types.Part.from_bytes(
-                                data=audio_bytes,
-                                mime_type="audio/wav"
-                            )
-                        ],
-                    ),
-                ]
+                cache_name, prompt_delta = self._resolve_cached_prompt(base_prompt)
+
+                parts = [types.Part.from_text(text=prompt_delta)] if prompt_delta else []
+                parts.append(
+                    types.Part.from_bytes(
+                        data=audio_bytes,
+                        mime_type=mime_type
+                    )
+                )
+                contents = [types.Content(role="user", parts=parts)]
                 
                 # 生成配置，优化参数
                 thinking_budget = config.GEMINI_THINKING_BUDGET
@@ -330,6 +367,7 @@ class GeminiTranscriber:
                     response_mime_type="text/plain",
                     temperature=0.0,  # 更低温度，更快响应
                     max_output_tokens=1000,  # 减少输出token限制
+                    cached_content=cache_name,
                 )
 
                 # API调用
@@ -348,6 +386,14 @@ class GeminiTranscriber:
             except Exception as e:
                 error_msg = str(e)
                 print(f"⚠️  第 {attempt + 1} 次尝试失败: {error_msg}")
+
+                # 仅在缓存过期或被删除时丢弃缓存，下一次尝试改用完整提示词；
+                # 网络等其他错误保留缓存，照常走下面的重试判断
+                if cache_name and _is_context_cache_error(error_msg):
+                    self._invalidate_context_cache(cache_name)
+                    if attempt < config.GEMINI_MAX_RETRIES - 1:
+                        print("🔄 上下文缓存不可用，改用完整提示词重试...")
+                        continue
                 
                 # 判断是否应该重试
                 if attempt < config.GEMINI_MAX_RETRIES - 1:
@@ -368,6 +414,92 @@ class GeminiTranscriber:
         
         self.last_run_info["api_attempts"] = config.GEMINI_MAX_RETRIES
         return None
+
+    # ==================== 上下文缓存 ====================
+
+    def prime_context_cache(self) -> bool:
+        """将提示词静态前缀（基础提示词、词典、纠错示例）写入 Gemini 上下文缓存"""
+        if not self.is_ready or not config.GEMINI_CONTEXT_CACHE_ENABLED:
+            return False
+
+        static_prompt, _ = self._build_prompt_sections()
+        ttl = f"{int(config.GEMINI_CONTEXT_CACHE_TTL)}s"
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    contents=[
+                        types.Content(
+                            role="user",
+                            parts=[types.Part.from_text(text=static_prompt)],
+                        )
+                    ],
+                    ttl=ttl,
+                ),
+            )
+        except Exception as exc:
+            self._invalidate_context_cache()
+            if config.DEBUG_MODE:
+                print(f"⚠️ Gemini 上下文缓存创建失败，继续发送完整提示词: {exc}")
+            return False
+
+        with self._context_cache_lock:
+            previous = self._context_cache_name
+            self._context_cache_name = cache.name
+            self._context_cache_prompt = static_prompt
+        if previous and previous != cache.name:
+            self._delete_context_cache(previous)
+
+        if config.DEBUG_MODE:
+            print(f"🗄️ Gemini 上下文缓存已就绪: {cache.name} (TTL {ttl})")
+        return True
+
+    def refresh_context_cache(self) -> bool:
+        """续期上下文缓存；提示词静态部分变化或缓存失效时重新创建"""
+        cache_name = self._context_cache_name
+        if not cache_name:
+            return self.prime_context_cache()
+
+        static_prompt, _ = self._build_prompt_sections()
+        if static_prompt != self._context_cache_prompt:
+            return self.prime_context_cache()
+
+        ttl = f"{int(config.GEMINI_CONTEXT_CACHE_TTL)}s"
+        try:
+            self.client.caches.update(
+                name=cache_name,
+                config=types.UpdateCachedContentConfig(ttl=ttl),
+            )
+            return True
+        except Exception as exc:
+            if config.DEBUG_MODE:
+                print(f"⚠️ Gemini 上下文缓存续期失败，重新创建: {exc}")
+            self._invalidate_context_cache(cache_name)
+            return self.prime_context_cache()
+
+    def _resolve_cached_prompt(self, prompt_text: str) -> Tuple[Optional[str], str]:
+        """返回 (缓存名, 需随请求发送的提示词)；静态前缀不匹配时不使用缓存"""
+        with self._context_cache_lock:
+            cache_name = self._context_cache_name
+            cached_prompt = self._context_cache_prompt
+        if not cache_name or not cached_prompt or not prompt_text.startswith(cached_prompt):
+            return None, prompt_text
+        return cache_name, prompt_text[len(cached_prompt):].strip()
+
+    def _invalidate_context_cache(self, cache_name: Optional[str] = None) -> None:
+        """丢弃本地缓存引用（仅当仍指向 cache_name 时）"""
+        with self._context_cache_lock:
+            if cache_name is None or self._context_cache_name == cache_name:
+                self._context_cache_name = None
+                self._context_cache_prompt = None
+
+    def _delete_context_cache(self, cache_name: str) -> None:
+        """删除服务端缓存，失败时忽略（到期后会自动清理）"""
+        try:
+            self.client.caches.delete(name=cache_name)
+        except Exception as exc:
+            if config.DEBUG_MODE:
+                print(f"⚠️ 删除 Gemini 上下文缓存失败: {exc}")
     
     def _call_gemini_audio_api(self, audio_file_path: str) -> Optional[str]:
         """调用Gemini音频API，包含重试机制和错误处理"""
@@ -454,7 +586,7 @@ class GeminiTranscriber:
         创建压缩的音频字节数据（直接在内存中处理，无需临时文件）
         
         Args:
-            audio_data: 音频数据
+            audio_data: 音频数据（int16 数据将直接写入，无需再转换）
             sample_rate: 采样率（可选，用于降采样）
             
         Returns:
@@ -477,7 +609,7 @@ class GeminiTranscriber:
                 wav_file.setnchannels(config.CHANNELS)
                 wav_file.setsampwidth(2)  # 16-bit
                 wav_file.setframerate(sample_rate or config.SAMPLE_RATE)
-                wav_file.writeframes(audio_data.tobytes())
+                wav_file.writeframes(memoryview(np.ascontiguousarray(audio_data)))
             
             # 获取字节数据
             audio_bytes = buffer.getvalue()
@@ -489,6 +621,38 @@ class GeminiTranscriber:
             print(f"❌ 创建压缩音频数据失败: {e}")
             return None
     
+    def _encode_upload_audio(self, audio_data: np.ndarray,
+                             sample_rate: Optional[int] = None) -> Tuple[Optional[bytes], str]:
+        """
+        按 GEMINI_UPLOAD_AUDIO_FORMAT 编码上传音频（FLAC/Opus），显著减少上传体积
+
+        短音频、soundfile 不可用或编码失败时回退为 WAV。
+
+        Returns:
+            (音频字节数据或 None, MIME 类型)
+        """
+        rate = sample_rate or config.SAMPLE_RATE
+        codec = _UPLOAD_CODECS.get(str(getattr(config, "GEMINI_UPLOAD_AUDIO_FORMAT", "wav")).lower())
+        min_seconds = getattr(config, "GEMINI_UPLOAD_ENCODE_MIN_SECONDS", 3.0)
+
+        if codec and SOUNDFILE_AVAILABLE and len(audio_data) >= rate * min_seconds:
+            sf_format, subtype, mime_type = codec
+            if audio_data.dtype != np.int16:
+                audio_data = (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
+            started = time.perf_counter()
+            try:
+                buffer = io.BytesIO()
+                sf.write(buffer, audio_data, rate, format=sf_format, subtype=subtype)
+                self.last_run_info["audio_format"] = mime_type
+                self.last_run_info["encoding_ms"] = (time.perf_counter() - started) * 1000
+                return buffer.getvalue(), mime_type
+            except Exception as e:
+                if config.DEBUG_MODE:
+                    print(f"⚠️ {sf_format}/{subtype} 编码失败，回退为 WAV: {e}")
+
+        self.last_run_info["audio_format"] = "audio/wav"
+        return self._create_compressed_audio_bytes(audio_data, sample_rate=sample_rate), "audio/wav"
+
     def _save_audio_to_temp_file(self, audio_data: np.ndarray) -> Optional[str]:
         """
         将音频数据保存为临时 WAV 文件（向后兼容）
@@ -522,8 +686,11 @@ class GeminiTranscriber:
     
     def stop_processing(self):
         """停止处理（兼容接口）"""
-        # Gemini 是请求-响应模式，无需特殊停止操作
-        pass
+        # Gemini 是请求-响应模式，只需释放上下文缓存
+        cache_name = self._context_cache_name
+        if cache_name:
+            self._invalidate_context_cache(cache_name)
+            self._delete_context_cache(cache_name)
     
     def get_supported_formats(self) -> List[str]:
         """获取支持的音频格式"""
@@ -544,13 +711,20 @@ class GeminiTranscriber:
 
     def _build_prompt(self) -> str:
         """生成包含词典与纠错记忆的提示词"""
+        static_prompt, history_prompt = self._build_prompt_sections()
+        if not history_prompt:
+            return static_prompt
+        return f"{static_prompt}\n\n{history_prompt}"
+
+    def _build_prompt_sections(self) -> Tuple[str, str]:
+        """生成提示词的静态前缀（基础提示词+词典+纠错示例）与近期历史两部分"""
 
         inject_dict = getattr(config, "INJECT_DICTIONARY_IN_PROMPT", True)
         inject_corr = getattr(config, "INJECT_CORRECTIONS_IN_PROMPT", True)
         inject_history = getattr(config, "INJECT_HISTORY_IN_PROMPT", True)
 
         if not any([inject_dict, inject_corr, inject_history]):
-            return config.GEMINI_TRANSCRIPTION_PROMPT
+            return config.GEMINI_TRANSCRIPTION_PROMPT, ""
 
         cache_key = self._get_prompt_cache_key(inject_dict, inject_corr, inject_history)
         if (
@@ -581,6 +755,9 @@ class GeminiTranscriber:
                 )
                 parts.append(f"{header}\n{corr_section}")
 
+        static_prompt = "\n\n".join(parts)
+        history_prompt = ""
+
         if inject_history:
             history_section = self._load_history_section()
             if history_section:
@@ -589,28 +766,26 @@ class GeminiTranscriber:
                     "PROMPT_HISTORY_HEADER",
                     "近期会话上下文（仅供参考）：",
                 )
-                parts.append(f"{header}\n{history_section}")
+                history_prompt = f"{header}\n{history_section}"
 
-        prompt_text = "\n\n".join(parts)
         if getattr(config, "PRINT_PROMPT_ON_TRANSCRIBE", False):
             print("\n===== PROMPT START =====")
-            print(prompt_text)
+            print("\n\n".join(part for part in (static_prompt, history_prompt) if part))
             print("===== PROMPT END =====\n")
-        self._prompt_cache = prompt_text
+        self._prompt_cache = (static_prompt, history_prompt)
         self._prompt_cache_mtime = cache_key
-        return prompt_text
+        return self._prompt_cache
 
     def _get_prompt_cache_key(
         self, inject_dict: bool, inject_corr: bool, inject_history: bool
     ) -> Tuple[float, float, float]:
         dictionary_path = Path(config.DICTIONARY_FILE)
         corrections_path = Path(config.PROJECT_ROOT) / "logs" / "corrections.txt"
-        history_path = Path(config.PROJECT_ROOT) / "logs" / "history.json"
 
         dict_mtime = dictionary_path.stat().st_mtime if (inject_dict and dictionary_path.exists()) else 0.0
         corr_mtime = corrections_path.stat().st_mtime if (inject_corr and corrections_path.exists()) else 0.0
-        history_mtime = history_path.stat().st_mtime if (inject_history and history_path.exists()) else 0.0
-        return dict_mtime, corr_mtime, history_mtime
+        history_version = history_store.version if inject_history else 0
+        return dict_mtime, corr_mtime, history_version
 
     def _load_dictionary_section(self) -> str:
         dictionary_path = Path(config.DICTIONARY_FILE)
@@ -643,39 +818,26 @@ class GeminiTranscriber:
             return ""
 
     def _load_history_section(self) -> str:
-        history_path = Path(config.PROJECT_ROOT) / "logs" / "history.json"
-        if not history_path.exists():
-            return ""
+        limit = max(1, getattr(config, "PROMPT_HISTORY_LIMIT", 2))
+        max_chars = max(50, getattr(config, "PROMPT_HISTORY_MAX_CHARS", 300))
 
         try:
-            raw = history_path.read_text(encoding="utf-8")
-            history = json.loads(raw) if raw.strip() else []
+            recent = deque(
+                (text for entry in history_store.iter_entries() if (text := (entry.get("text") or "").strip())),
+                maxlen=limit,
+            )
         except Exception as exc:
             if config.DEBUG_MODE:
-                print(f"⚠️ 读取 history.json 失败: {exc}")
-            return ""
-
-        if not isinstance(history, list):
+                print(f"⚠️ 读取 history.jsonl 失败: {exc}")
             return ""
 
-        limit = max(1, getattr(config, "PROMPT_HISTORY_LIMIT", 2))
-        max_chars = max(50, getattr(config, "PROMPT_HISTORY_MAX_CHARS", 300))
-
-        recent_texts: List[str] = []
-        for entry in history:
-            if not isinstance(entry, dict):
-                continue
-            text = (entry.get("text") or "").strip()
-            if not text:
-                continue
-            if len(text) > max_chars:
-                text = text[: max_chars - 1].rstrip() + "…"
-            recent_texts.append(text)
-
-        if not recent_texts:
+        if not recent:
             return ""
 
-        selected = recent_texts[-limit:]
+        selected = [
+            text[: max_chars - 1].rstrip() + "…" if len(text) > max_chars else text
+            for text in recent
+        ]
         lines = [f"{idx}. {value}" for idx, value in enumerate(selected, start=1)]
         return "\n".join(lines)
 
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+会话历史存储模块
+以追加写 JSONL（每行一条记录）保存转录历史，写入只追加一行；
+条目数超出上限一定比例后压缩为最近 HISTORY_MAX_ENTRIES 条。
+本进程是唯一写入方，启动时读取一次后在内存中维护最近记录，读取不再访问磁盘；
+磁盘写入由后台线程批量完成，不阻塞转录完成路径
+"""
+
+import json
+import os
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import config
+
+try:
+    import orjson  # C 扩展，序列化/解析速度明显快于标准库
+except ImportError:  # pragma: no cover - 未安装时回退到标准库
+    orjson = None  # type: ignore
+
+
+def _dumps_line(entry: Dict[str, Any]) -> bytes:
+    """序列化为一行 UTF-8 JSON（含换行符）"""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# 后台写入线程的批量合并参数
+_WRITE_BATCH_SIZE = 32
+_WRITE_COALESCE_SECONDS = 0.1
+_STOP = object()
+
+HISTORY_FILE = Path(config.PROJECT_ROOT) / "logs" / "history.jsonl"
+LEGACY_HISTORY_FILE = Path(config.PROJECT_ROOT) / "logs" / "history.json"
+
+
+class HistoryStore:
+    """追加写历史记录存储（线程安全）"""
+
+    def __init__(self, path: Path = HISTORY_FILE):
+        """初始化存储，必要时从旧版 history.json 迁移"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._migrate_legacy()
+        self._line_count = self._count_lines()
+        self._entries: Deque[Dict[str, Any]] = deque(self._read_file(), maxlen=self.max_entries)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="HistoryWriter", daemon=True)
+        self._writer.start()
+
+    @property
+    def max_entries(self) -> int:
+        return getattr(config, "HISTORY_MAX_ENTRIES", 200)
+
+    def _migrate_legacy(self) -> None:
+        """将旧版 JSON 数组格式的 history.json 转为 JSONL（仅执行一次）"""
+        if self.path.exists() or not LEGACY_HISTORY_FILE.exists():
+            return
+        try:
+            raw = LEGACY_HISTORY_FILE.read_bytes()
+            entries = _loads(raw) if raw.strip() else []
+        except Exception as exc:
+            print(f"⚠️ 旧版 history.json 解析失败，跳过迁移: {exc}")
+            return
+        if not isinstance(entries, list):
+            return
+        self._rewrite([entry for entry in entries if isinstance(entry, dict)][-self.max_entries:])
+        print(f"📦 已将 history.json 迁移为 {self.path.name}（{len(entries)} 条）")
+
+    def _count_lines(self) -> int:
+        if not self.path.exists():
+            return 0
+        try:
+            with self.path.open("rb") as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+    @property
+    def version(self) -> int:
+        """内存记录的版本号，每次追加递增（供提示词缓存判断失效）"""
+        return self._version
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """追加一条历史记录（内存立即可见，落盘交给后台写入线程）"""
+        with self._lock:
+            self._entries.append(entry)
+            self._version += 1
+            self._queue.put(entry)
+
+    def _writer_loop(self) -> None:
+        """后台写入线程：合并短时间内的多条记录后一次性追加到文件"""
+        while True:
+            item = self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= _WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=_WRITE_COALESCE_SECONDS)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            payload = b"".join(_dumps_line(entry) for entry in batch)
+            with self.path.open("ab") as f:
+                f.write(payload)
+            self._line_count += len(batch)
+            if self._line_count > int(self.max_entries * 1.5):
+                self._compact()
+        except Exception as exc:
+            print(f"⚠️ 写入历史记录失败: {exc}")
+
+    def _compact(self) -> None:
+        """只保留最近 max_entries 条记录，写临时文件后原子替换"""
+        with self._lock:
+            # 队列中尚未落盘的记录已包含在内存快照里，丢弃以免重复写入
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    break
+            entries = list(self._entries)
+            self._rewrite(entries)
+            self._line_count = len(entries)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """写完队列中剩余的记录并停止后台写入线程"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=timeout)
+
+    def _rewrite(self, entries: List[Dict[str, Any]]) -> None:
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with tmp_path.open("wb") as f:
+            f.writelines(_dumps_line(entry) for entry in entries)
+        os.replace(tmp_path, self.path)
+
+    def _read_file(self) -> Iterator[Dict[str, Any]]:
+        """按写入顺序逐条解析磁盘上的历史记录（跳过损坏行）"""
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as f:
+            for line in f:
+                entry = _parse_line(line)
+                if entry is not None:
+                    yield entry
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """按写入顺序遍历内存中的历史记录快照"""
+        with self._lock:
+            snapshot = list(self._entries)
+        return iter(snapshot)
+
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """返回最近 limit 条历史记录"""
+        if limit <= 0:
+            return []
+        with self._lock:
+            return list(self._entries)[-limit:]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """返回最新一条历史记录"""
+        with self._lock:
+            return self._entries[-1] if self._entries else None
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = _loads(line)
+    except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError 均为 ValueError 子类
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+# 全局历史存储实例
+history_store = HistoryStore()
@@ -4,25 +4,34 @@
 使用 Gemini 进行音频转录，支持可配置的长按热键控制录音
 """
 
+import functools
+import itertools
 import time
 import signal
 import sys
-import json
-from enum import Enum
-from typing import Optional, List, Dict, Any, Callable
-from dataclasses import dataclass, field
-from pathlib import Path
+import traceback
+import re
+from enum import IntEnum
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Callable, Mapping
+from dataclasses import dataclass, field, replace
 import threading
 import queue
-import pyperclip
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
 
 # 导入各个模块
 from hotkey_listener import HotkeyListener
 from audio_recorder import AudioRecorder
 from service_registry import get_transcriber, get_dictionary, get_corrector
-from timer_utils import Timer
+from dictionary_manager import TranscriptSegment
+from timer_utils import Timer, TimingResult
 from notification_utils import notification_manager
+from clipboard_utils import copy_text
 from audio_retry_manager import audio_retry_manager  # 导入重试管理器
+from transcript_cache import TranscriptCache, transcript_cache
+from history_store import history_store
 
 # 导入新的会话模式组件
 from session_mode_manager import SessionModeManager, SessionMode, SessionState
@@ -30,12 +39,129 @@ from text_input_manager import TextInputManager, InputMethod, InputRequest, Inpu
 from correction_memory import start_hotkey_listener, stop_hotkey_listener
 import config
 
-class AppState(Enum):
-    """应用状态枚举"""
-    IDLE = "待机"
-    RECORDING = "录音中"
-    PROCESSING = "处理中"
-    COMPLETE = "完成"
+# 剪贴板通知来源标签
+_NOTIFY_TAG_TRANSCRIBE = "Gemini转录"
+_NOTIFY_TAG_CORRECTED = "纠错完成"
+_NOTIFY_TAG_RETRY = "重试转录成功"
+_NOTIFY_TAG_SESSION = "会话完成"
+
+# 转录器 last_run_info 中需要并入会话报告的字段
+_RUN_INFO_KEYS = frozenset({
+    "strategy", "compressed_kb", "transcript_chars", "api_attempts", "payload_type",
+    "audio_format", "encoding_ms", "chunks_total", "chunks_success", "model",
+})
+
+# 会话报告中按阶段展示的子报告；缺失时共用只读空映射，不再逐次新建空 dict
+_SUMMARY_SECTIONS = ("recording", "transcription", "dictionary", "clipboard", "autopaste")
+_EMPTY_SECTION: Mapping[str, Any] = MappingProxyType({})
+
+# 热键展示文本（去重后保持配置顺序），模块加载时计算一次
+_HOTKEY_LABELS = tuple(dict.fromkeys(config.HOTKEY_DISPLAY_LABELS)) or (config.HOTKEY_PRIMARY_LABEL,)
+_HOTKEY_HINT = " / ".join(_HOTKEY_LABELS)
+
+# 会话报告的标量初始字段（_create_session_context 中展开复制）
+_EMPTY_REPORT_TEMPLATE: Dict[str, Any] = {
+    "task_id": None,
+    "stop_reason": "",
+    "text": "",
+    "original_text": "",
+    "total_duration_ms": None,
+}
+
+# 启动横幅模板，由 format_map 填充运行时状态
+_BANNER_TEMPLATE = "\n".join([
+    "",
+    "🎤 Gemini 语音转录系统 v2.0",
+    "================================",
+    "快捷键: 按住 {hotkey_hint} 键（松开即停止）",
+    "状态: {state}",
+    "模式: 一口气模式 📱",
+    "转录引擎: Gemini-{transcription_model}",
+    "纠错引擎: {correction_model}",
+    "词典: {dictionary_size} 个词汇",
+    "剪贴板: {clipboard_status}",
+    "Gemini转录: {transcription_status}",
+    "Gemini纠错: {correction_status}",
+    "通知系统: {notification_status}",
+    "最大录音时长: {max_duration}",
+    "================================",
+])
+
+# TEXT_INPUT_METHOD 配置值到输入方法的映射（未列出的值视为禁用自动粘贴）
+_INPUT_METHOD_MAP: Dict[str, InputMethod] = {
+    "direct_type": InputMethod.DIRECT_TYPE,
+    "clipboard": InputMethod.CLIPBOARD_PASTE,
+}
+
+# 会话报告与录音开始/停止横幅的分隔线与标题，模块加载时构造一次
+_SEP50 = "=" * 50
+_BORDER_HEAVY = "═" * 60
+_BORDER_LIGHT = "-" * 60
+_SESSION_TITLE = "🎯 会话报告".center(60)
+
+# 不含连续 3 个以上文字字符（如“嗯。。”、纯标点/语气词）的文本没有纠错价值
+_WORD_RUN_RE = re.compile(r'[\w\u4e00-\u9fff]{3,}')
+
+
+def _write_lines(lines: List[str]) -> None:
+    """一次性写出多行终端输出"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+# 时长模板：按 (有小时, 有分钟) 选择，避免逐级分支判断
+_DURATION_TEMPLATES = {
+    (True, True): "{h}小时{m}分钟{s}秒",
+    (True, False): "{h}小时{m}分钟{s}秒",
+    (False, True): "{m}分钟{s}秒",
+    (False, False): "{s}秒",
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _format_duration(seconds: int) -> str:
+    """格式化时长显示"""
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return _DURATION_TEMPLATES[(h > 0, m > 0)].format(h=h, m=m, s=s)
+
+
+@functools.lru_cache(maxsize=256)
+def _format_ms(duration_ms: float) -> str:
+    """毫秒格式化（纯函数，结果缓存）"""
+    if duration_ms < 1000:
+        return f"{duration_ms:.1f}ms"
+    return f"{duration_ms/1000:.2f}s ({duration_ms:.1f}ms)"
+
+
+@functools.lru_cache(maxsize=256)
+def _format_seconds(seconds: float) -> str:
+    """浮点秒格式化（纯函数，结果缓存）"""
+    if seconds < 60:
+        return f"{seconds:.2f}s"
+    minutes = int(seconds // 60)
+    secs = seconds % 60
+    if minutes < 60:
+        return f"{minutes}分{secs:.1f}秒"
+    hours = minutes // 60
+    minutes = minutes % 60
+    return f"{hours}小时{minutes}分{secs:.0f}秒"
+
+
+class AppState(IntEnum):
+    """应用状态枚举（整数值，展示文本见 label）"""
+    IDLE = 0
+    RECORDING = 1
+    PROCESSING = 2
+    COMPLETE = 3
+
+    @property
+    def label(self) -> str:
+        return _STATE_LABELS[self]
+
+
+# 按 AppState 整数值索引的状态展示文本
+_STATE_LABELS = ("待机", "录音中", "处理中", "完成")
 
 
 @dataclass
@@ -46,7 +172,7 @@ class SessionContext:
     timer: Timer
     report: Dict[str, Any] = field(default_factory=dict)
     status: str = "recording"
-    final_transcript: Optional[List[Dict[str, Any]]] = None
+    final_transcript: Optional[List[TranscriptSegment]] = None
     last_autopaste_text: Optional[str] = None
     stop_reason: str = ""
     created_at: float = field(default_factory=time.time)
@@ -54,12 +180,19 @@ class SessionContext:
     transcript_text: str = ""
     failure_reason: Optional[str] = None
     history_written: bool = False
+    audio_sha256: Optional[bytes] = None
+    cache_hit: bool = False
+    cached_correction: Optional[str] = None
 
 class GeminiVoiceTranscriptionApp:
     def __init__(self, session_mode: Optional[SessionMode] = None, **session_config):
         """初始化基于 Gemini 的语音转录应用"""
-        self.state = AppState.IDLE
         self.state_lock = threading.Lock()
+        self._state = AppState.IDLE
+        # 调试模式下状态变化推送到队列，由状态输出线程按需重绘
+        self._state_events: Optional[queue.Queue] = queue.Queue() if config.DEBUG_MODE else None
+        # 分步计时日志仅在调试模式输出，最终会话报告始终显示
+        self._verbose = config.DEBUG_MODE
         
         # 会话模式配置
         self.use_new_session_mode = session_mode is not None
@@ -105,7 +238,8 @@ class GeminiVoiceTranscriptionApp:
             self.audio_recorder = AudioRecorder()
             self.transcriber = get_transcriber()
             self.dictionary_manager = get_dictionary()
-            self.gemini_corrector = get_corrector()
+            # 未启用 Gemini 纠错时不创建纠错器
+            self.gemini_corrector = get_corrector() if config.ENABLE_GEMINI_CORRECTION else None
             self.text_input_manager = TextInputManager()
             
             # 重试管理器配置
@@ -123,36 +257,52 @@ class GeminiVoiceTranscriptionApp:
             on_press=self._on_hotkey_press,
             on_release=self._on_hotkey_release
         )
-        self.hotkey_labels = list(dict.fromkeys(config.HOTKEY_DISPLAY_LABELS)) or [config.HOTKEY_PRIMARY_LABEL]
+        self.hotkey_labels = list(_HOTKEY_LABELS)
         self.primary_hotkey_label = config.HOTKEY_PRIMARY_LABEL
-        self.hotkey_hint = " / ".join(self.hotkey_labels)
+        self.hotkey_hint = _HOTKEY_HINT
         self.timer = Timer()
 
         # 会话上下文管理
         self.active_session: Optional[SessionContext] = None
         self.session_contexts: Dict[str, SessionContext] = {}
-        self.processing_order: List[str] = []
+        # 有序集合：按提交顺序记录处理中的任务，刷新/移除均为 O(1)
+        self.processing_order: "OrderedDict[str, None]" = OrderedDict()
         self.latest_task_id: Optional[str] = None
         self.session_counter = 0
-        self.history_file = Path(config.PROJECT_ROOT) / "logs" / "history.json"
-        self.history_lock = threading.Lock()
-        self.history_file.parent.mkdir(parents=True, exist_ok=True)
-        if not self.history_file.exists():
-            self.history_file.write_text("[]", encoding="utf-8")
+        # 自动粘贴请求与兜底会话的单调递增编号（不依赖墙钟时间）
+        self._request_ids = itertools.count(1)
+        self.history_store = history_store
         self._global_last_autopaste_text: Optional[str] = None
         self.correction_hotkey_active = False
 
-        # 运行标志
-        self.running = False
+        # 剪贴板发布串行化，避免重试回调与新会话同时写入剪贴板
+        self._pub_lock = threading.Lock()
+        self._last_clipboard: Optional[str] = None
+        self._clipboard_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Clipboard")
+        self._clipboard_future: Optional[Future] = None
+        # 通知（控制台横幅、提示音、系统通知）统一在单独线程中按序执行，不阻塞调用方
+        self._notify_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Notify")
+        # 会话模式的停止后处理（批量转录、纠错、收尾）在独立线程执行，热键动作线程立即返回；
+        # 会话管理器同一时间只处理一个会话，因此单线程串行
+        self._pipeline_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SessionPipeline")
+        self._session_future: Optional[Future] = None
+
+        # 退出事件：主循环、状态输出与缓存续期线程都等待它
+        self._shutdown_event = threading.Event()
         
-        # 超时管理
-        self.timeout_thread = None
-        self.timeout_stop_event = threading.Event()
-        self.warning_shown = False
+        # 超时管理：录音开始时挂两个一次性定时器（警告/超时），停止时取消
+        self._warn_timer: Optional[threading.Timer] = None
+        self._timeout_timer: Optional[threading.Timer] = None
         self.recording_start_time: Optional[float] = None
+        self._max_duration_text = _format_duration(config.MAX_RECORDING_DURATION)
+
+        # 自动粘贴相关配置快照（热路径只读实例属性）
+        self.apply_config()
 
-        # 热键动作异步执行队列，避免阻塞系统事件线程
-        self._action_queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        # 热键动作异步执行队列，避免阻塞系统事件线程；
+        # 单生产者（热键线程）/单消费者，deque 的 append/popleft 本身是原子的，仅用 Event 唤醒
+        self._action_deque: "deque[Optional[Callable[[], None]]]" = deque()
+        self._action_wake = threading.Event()
         self._action_dispatcher_stop = threading.Event()
         self._action_worker = threading.Thread(
             target=self._process_action_queue,
@@ -165,35 +315,58 @@ class GeminiVoiceTranscriptionApp:
         self._last_hotkey_health_check = 0.0
 
         # 状态检查
-        clipboard_status = "✅" if config.ENABLE_CLIPBOARD else "❌"
-        gemini_transcription_status = "✅" if self.transcriber.is_ready else "❌"
-        gemini_correction_status = "✅" if config.ENABLE_GEMINI_CORRECTION and self.gemini_corrector.is_ready else "❌"
-        notification_status = "✅" if config.ENABLE_NOTIFICATIONS else "❌"
-        
-        max_duration_hours = config.MAX_RECORDING_DURATION // 3600
-        max_duration_minutes = (config.MAX_RECORDING_DURATION % 3600) // 60
-        duration_text = f"{max_duration_hours}小时{max_duration_minutes}分钟" if max_duration_hours > 0 else f"{max_duration_minutes}分钟"
-        
-        # 显示模式特定信息
-        mode_info = """
-模式: 一口气模式 📱"""
-        
-        print(f"""
-🎤 Gemini 语音转录系统 v2.0
-================================
-快捷键: 按住 {self.hotkey_hint} 键（松开即停止）
-状态: {self.state.value}{mode_info}
-转录引擎: Gemini-{config.GEMINI_TRANSCRIPTION_MODEL}
-纠错引擎: {config.GEMINI_MODEL}
-词典: {len(self.dictionary_manager.user_dict)} 个词汇
-剪贴板: {clipboard_status}
-Gemini转录: {gemini_transcription_status}
-Gemini纠错: {gemini_correction_status}
-通知系统: {notification_status}
-最大录音时长: {duration_text}
-================================
-        """)
+        print(_BANNER_TEMPLATE.format_map({
+            "hotkey_hint": self.hotkey_hint,
+            "state": self.state.label,
+            "transcription_model": config.GEMINI_TRANSCRIPTION_MODEL,
+            "correction_model": config.GEMINI_MODEL,
+            "dictionary_size": len(self.dictionary_manager.user_dict),
+            "clipboard_status": "✅" if config.ENABLE_CLIPBOARD else "❌",
+            "transcription_status": "✅" if self.transcriber.is_ready else "❌",
+            "correction_status": "✅" if config.ENABLE_GEMINI_CORRECTION and self.gemini_corrector is not None and self.gemini_corrector.is_ready else "❌",
+            "notification_status": "✅" if config.ENABLE_NOTIFICATIONS else "❌",
+            "max_duration": self._max_duration_text,
+        }))
     
+    def apply_config(self) -> None:
+        """刷新自动粘贴相关的配置快照（运行时修改 config 后调用）"""
+        self._cfg_autopaste = getattr(config, 'AUTO_PASTE_ENABLED', True)
+        self._cfg_input_method_name = getattr(config, 'TEXT_INPUT_METHOD', 'clipboard')
+        self._cfg_input_method: Optional[InputMethod] = _INPUT_METHOD_MAP.get(self._cfg_input_method_name)
+        self._cfg_input_delay = max(getattr(config, 'TEXT_INPUT_DELAY', 0.1), 0.1)
+        # 自动粘贴请求除文本与 ID 外的字段都来自配置，预先构造一次
+        self._paste_request_template = InputRequest(
+            text="",
+            method=self._cfg_input_method or InputMethod.DISABLED,
+            delay_before=self._cfg_input_delay,
+            delay_after=0.1,
+            backup_to_clipboard=True,
+        )
+
+    @property
+    def state(self) -> AppState:
+        return self._state
+
+    @state.setter
+    def state(self, value: AppState) -> None:
+        with self.state_lock:
+            changed = value is not self._state
+            self._state = value
+        if changed and self._state_events is not None:
+            self._state_events.put(value)
+
+    def _transition(self, expected, new: AppState) -> bool:
+        """原子状态切换：当前状态属于 expected（单个状态或元组）时切换为 new 并返回 True"""
+        allowed = expected if isinstance(expected, tuple) else (expected,)
+        with self.state_lock:
+            if self._state not in allowed:
+                return False
+            changed = new is not self._state
+            self._state = new
+        if changed and self._state_events is not None:
+            self._state_events.put(new)
+        return True
+
     def _on_hotkey_press(self):
         """录音热键长按触发回调"""
         self._schedule_action(self._handle_hotkey_press_action)
@@ -203,42 +376,29 @@ Gemini纠错: {gemini_correction_status}
         self._schedule_action(self._handle_hotkey_release_action)
 
     def _handle_hotkey_press_action(self):
-        should_start = False
-        with self.state_lock:
-            if self.state != AppState.RECORDING:
-                should_start = True
-            elif config.DEBUG_MODE:
-                pending = len(self.processing_order)
-                print(f"当前状态 {self.state.value}，忽略开始录音请求（后台处理中 {pending} 个任务）")
-        if should_start:
-            self._start_recording()
+        self._start_recording()
 
     def _handle_hotkey_release_action(self):
-        should_stop = False
-        with self.state_lock:
-            if self.state == AppState.RECORDING:
-                should_stop = True
-            elif config.DEBUG_MODE:
-                print(f"当前状态 {self.state.value}，忽略停止录音请求")
-        if should_stop:
-            self._stop_recording()
+        self._stop_recording()
 
     def _schedule_action(self, action: Callable[[], None]) -> None:
         if self._action_dispatcher_stop.is_set():
             return
-        self._action_queue.put(action)
+        self._action_deque.append(action)
+        self._action_wake.set()
 
     def _process_action_queue(self) -> None:
         while True:
-            action = self._action_queue.get()
-            try:
+            self._action_wake.wait()
+            self._action_wake.clear()
+            while self._action_deque:
+                action = self._action_deque.popleft()
                 if action is None:
                     return
-                action()
-            except Exception as exc:
-                print(f"⚠️ 热键动作执行错误: {exc}")
-            finally:
-                self._action_queue.task_done()
+                try:
+                    action()
+                except Exception as exc:
+                    print(f"⚠️ 热键动作执行错误: {exc}")
     
     # ==================== 新会话模式回调函数 ====================
     
@@ -252,15 +412,12 @@ Gemini纠错: {gemini_correction_status}
     
     def _on_session_complete(self, segments):
         """会话完成回调"""
-        total_text = ""
-        for segment in segments:
-            if hasattr(segment, 'final_text') and segment.final_text:
-                total_text += segment.final_text + " "
+        total_text = " ".join(t for segment in segments if (t := getattr(segment, 'final_text', None)))
         
-        print(f"✅ 会话完成: {len(segments)} 个分段，总计 {len(total_text.strip())} 字符")
+        print(f"✅ 会话完成: {len(segments)} 个分段，总计 {len(total_text)} 字符")
         
-        if total_text.strip():
-            print(f"📝 完整内容: {total_text.strip()}")
+        if total_text:
+            print(f"📝 完整内容: {total_text}")
     
     def _on_realtime_output(self, text: str):
         """实时输出回调"""
@@ -270,26 +427,22 @@ Gemini纠错: {gemini_correction_status}
         """会话错误回调"""
         print(f"❌ 会话错误: {error}")
         
-        if config.ENABLE_NOTIFICATIONS:
-            notification_manager.show_error_notification(f"会话错误: {error}")
+        self._notify("show_error_notification", f"会话错误: {error}")
 
     def _create_session_context(self) -> SessionContext:
         """创建新的会话上下文"""
         self.session_counter += 1
         session_id = f"session_{int(time.time() * 1000)}_{self.session_counter}"
         timer = Timer()
+        # 各阶段子报告必须每次新建，不能放进共享模板
         report = {
+            **_EMPTY_REPORT_TEMPLATE,
             "session_id": session_id,
-            "task_id": None,
-            "stop_reason": "",
             "recording": {},
             "transcription": {},
             "dictionary": {},
             "clipboard": {},
-            "text": "",
-            "original_text": "",
-            "total_duration_ms": None,
-            "created_at": time.time()
+            "created_at": time.time(),
         }
         context = SessionContext(
             session_id=session_id,
@@ -306,25 +459,8 @@ Gemini纠错: {gemini_correction_status}
         return bool(context.task_id and context.task_id == self.latest_task_id)
 
     def _append_history_entry(self, entry: Dict[str, Any]) -> None:
-        """写入历史记录"""
-        with self.history_lock:
-            try:
-                raw = self.history_file.read_text(encoding="utf-8")
-                history = json.loads(raw) if raw.strip() else []
-            except Exception:
-                history = []
-
-            history.append(entry)
-
-            # 可选：限制历史条目数量，避免文件无限增长
-            max_entries = getattr(config, "HISTORY_MAX_ENTRIES", 200)
-            if len(history) > max_entries:
-                history = history[-max_entries:]
-
-            self.history_file.write_text(
-                json.dumps(history, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+        """写入历史记录（仅入队，由 history_store 的后台线程落盘）"""
+        self.history_store.append(entry)
 
     def _record_history_entry(self, context: SessionContext, text: str, reason: str) -> None:
         """将会话结果写入历史记录"""
@@ -342,25 +478,30 @@ Gemini纠错: {gemini_correction_status}
     
     def _start_recording(self):
         """开始录音"""
-        if self.state == AppState.RECORDING:
+        if not self._transition((AppState.IDLE, AppState.PROCESSING, AppState.COMPLETE), AppState.RECORDING):
+            if config.DEBUG_MODE:
+                pending = len(self.processing_order)
+                print(f"当前状态 {self.state.label}，忽略开始录音请求（后台处理中 {pending} 个任务）")
             return
         
         if self.use_new_session_mode:
+            # 上一会话仍在后台处理时，等待其完成后再开始新会话
+            self._wait_for_session_pipeline()
             # 使用新的会话模式管理器
             success = self.session_manager.start_session(self.session_mode)
             if success:
-                self.state = AppState.RECORDING
                 self._global_last_autopaste_text = None
-                print(f"\n{'='*50}")
-                print(f"🎤 开始{self.session_mode.value}...")
+                lines = ["\n" + _SEP50, f"🎤 开始{self.session_mode.value}..."]
                 if self.session_mode == SessionMode.REALTIME:
                     silence_duration = getattr(config, 'VAD_SILENCE_DURATION', 4.0)
-                    print(f"🔇 静音检测: {silence_duration}秒后自动分段")
-                    print(f"📝 自动输出: 转录完成后直接输入到光标位置")
-                print(f"⏹️ 松开 {self.primary_hotkey_label} 键停止")
-                print(f"{'='*50}")
+                    lines.append(f"🔇 静音检测: {silence_duration}秒后自动分段")
+                    lines.append("📝 自动输出: 转录完成后直接输入到光标位置")
+                lines.append(f"⏹️ 松开 {self.primary_hotkey_label} 键停止")
+                lines.append(_SEP50)
+                _write_lines(lines)
             else:
                 print("❌ 录音启动失败")
+                self.state = AppState.IDLE
             return
         
         # 传统模式逻辑
@@ -368,40 +509,26 @@ Gemini纠错: {gemini_correction_status}
         self.active_session = context
         self.timer = context.timer
         self._global_last_autopaste_text = None
-
-        max_duration_text = self._format_duration(config.MAX_RECORDING_DURATION)
-        print(f"\n{'='*50}")
-        print(f"🎤 开始录音... (松开 {self.primary_hotkey_label} 键停止)")
-        print(f"⏰ 最大录音时长: {max_duration_text}")
-        print(f"🌐 转录引擎: Gemini-{config.GEMINI_TRANSCRIPTION_MODEL}")
-        print(f"{'='*50}")
+        with self._pub_lock:
+            self._last_clipboard = None
+
+        _write_lines([
+            "\n" + _SEP50,
+            f"🎤 开始录音... (松开 {self.primary_hotkey_label} 键停止)",
+            f"⏰ 最大录音时长: {self._max_duration_text}",
+            f"🌐 转录引擎: Gemini-{config.GEMINI_TRANSCRIPTION_MODEL}",
+            _SEP50,
+        ])
         
-        # 重置超时相关状态
-        self.warning_shown = False
-        self.timeout_stop_event.clear()
         context.recording_started_at = time.time()
         self.recording_start_time = context.recording_started_at
 
         # 重置计时器并开始录音计时
         context.timer.reset()
-        context.report.update({
-            "task_id": None,
-            "stop_reason": "",
-            "recording": {},
-            "transcription": {},
-            "dictionary": {},
-            "clipboard": {},
-            "text": "",
-            "original_text": "",
-            "total_duration_ms": None
-        })
         context.timer.start("total_session")
         context.timer.start("recording")
 
-        # 更新状态
-        self.state = AppState.RECORDING
-
-        # 启动超时检查线程
+        # 启动超时定时器
         self._start_timeout_monitoring()
         
         # 开始录音
@@ -409,8 +536,7 @@ Gemini纠错: {gemini_correction_status}
         
         if success:
             # 播放录音开始提示音
-            if config.ENABLE_NOTIFICATIONS:
-                notification_manager.show_start_recording_notification()
+            self._notify("show_start_recording_notification")
         else:
             print("❌ 录音启动失败")
             self.state = AppState.IDLE
@@ -421,25 +547,22 @@ Gemini纠错: {gemini_correction_status}
     
     def _stop_recording(self, auto_stopped=False):
         """停止录音"""
-        if self.state != AppState.RECORDING:
+        if not self._transition(AppState.RECORDING, AppState.PROCESSING):
+            if config.DEBUG_MODE and not auto_stopped:
+                print(f"当前状态 {self.state.label}，忽略停止录音请求")
             return
 
         if self.use_new_session_mode:
-            # 使用新的会话模式管理器
-            self.state = AppState.PROCESSING
-            
             stop_reason = "自动停止（超时）" if auto_stopped else "手动停止"
-            print(f"\n{'='*50}")
-            print(f"⏹️ 停止{self.session_mode.value} ({stop_reason})")
-            print(f"🔄 正在处理...")
-            print(f"{'='*50}")
-            
-            # 停止会话
-            segments = self.session_manager.stop_session()
-            
-            # 完成处理
-            self._finish_session()
-            self.recording_start_time = None
+            _write_lines([
+                "\n" + _SEP50,
+                f"⏹️ 停止{self.session_mode.value} ({stop_reason})",
+                "🔄 正在处理...",
+                _SEP50,
+            ])
+
+            # 停止会话与后续处理交给会话处理线程，热键动作线程不再被转录阻塞
+            self._session_future = self._pipeline_pool.submit(self._complete_session)
             return
 
         # 传统模式逻辑
@@ -447,54 +570,62 @@ Gemini纠错: {gemini_correction_status}
         if not context:
             if config.DEBUG_MODE:
                 print("⚠️ 未找到活跃会话上下文，忽略停止请求")
+            self.state = AppState.IDLE
             return
 
         # 停止超时监控
         self._stop_timeout_monitoring()
         
         stop_reason = "自动停止（超时）" if auto_stopped else "手动停止"
-        print(f"\n{'='*50}")
-        print(f"⏹️  停止录音，正在处理... ({stop_reason})")
-        print(f"🌐 使用 Gemini-{config.GEMINI_TRANSCRIPTION_MODEL} 转录")
-        print(f"{'='*50}")
-        
-        # 更新状态
-        self.state = AppState.PROCESSING
+
+        # 明显过短的误触：直接丢弃录音缓冲，跳过音频统计、量化与上传准备；
+        # 接近阈值的录音仍走完整路径，以实际音频长度判断
+        min_duration = getattr(config, "MIN_TRANSCRIPTION_DURATION", 2.0)
+        elapsed = time.time() - context.recording_started_at
+        if elapsed <= min_duration - 0.1:
+            context.timer.stop("recording")
+            self.audio_recorder.discard_recording()
+            self._handle_short_recording_cancel(context, elapsed, stop_reason)
+            return
+
+        _write_lines([
+            "\n" + _SEP50,
+            f"⏹️  停止录音，正在处理... ({stop_reason})",
+            f"🌐 使用 Gemini-{config.GEMINI_TRANSCRIPTION_MODEL} 转录",
+            _SEP50,
+        ])
 
         # 停止录音计时
         recording_time = context.timer.stop("recording")
         recording_duration_ms = recording_time.duration_ms if recording_time else None
-        if recording_duration_ms is not None:
+        if self._verbose and recording_duration_ms is not None:
             print(f"⏱️  录音时长: {context.timer.format_duration(recording_duration_ms)}")
 
         # 停止录音并获取完整音频
         final_audio = self.audio_recorder.stop_recording()
 
         stats = self.audio_recorder.get_recording_stats()
-        sample_rate = getattr(self.audio_recorder, "sample_rate", getattr(config, "SAMPLE_RATE", 16000))
-        frame_count = stats.get("total_frames", 0)
-        chunk_count = stats.get("chunk_count", 0)
-        audio_seconds = stats.get("duration_seconds", 0.0)
-
-        if final_audio is not None and len(final_audio) > 0:
-            frame_count = len(final_audio)
-            if sample_rate:
-                audio_seconds = frame_count / float(sample_rate)
+        # shape[0] 为帧数（多声道时 len 与 shape[0] 一致，但 size 不是），只取一次
+        frame_count = final_audio.shape[0] if final_audio is not None else 0
+        has_audio = frame_count > 0
+        if has_audio:
+            sample_rate = getattr(self.audio_recorder, "sample_rate", getattr(config, "SAMPLE_RATE", 16000))
+            audio_seconds = frame_count / float(sample_rate) if sample_rate else stats.get("duration_seconds", 0.0)
+        else:
+            frame_count = stats.get("total_frames", 0)
+            audio_seconds = stats.get("duration_seconds", 0.0)
 
         context.stop_reason = stop_reason
         context.report["stop_reason"] = stop_reason
         context.report["recording"] = {
             "timer_duration_ms": recording_duration_ms,
             "audio_seconds": audio_seconds,
-            "chunk_count": chunk_count,
+            "chunk_count": stats.get("chunk_count", 0),
             "frame_count": frame_count,
+            **({"raw_kb": final_audio.nbytes / 1024} if has_audio else {}),
         }
 
-        if final_audio is not None and len(final_audio) > 0:
-            context.report["recording"]["raw_kb"] = final_audio.nbytes / 1024
-
         # 计算录音时长，判断是否需要跳过转录
-        min_duration = getattr(config, "MIN_TRANSCRIPTION_DURATION", 2.0)
         recorded_seconds = 0.0
         if recording_time:
             recorded_seconds = max(recorded_seconds, recording_time.duration_ms / 1000.0)
@@ -507,7 +638,7 @@ Gemini纠错: {gemini_correction_status}
             return
 
         # 使用重试管理器处理音频
-        if final_audio is not None and len(final_audio) > 0:
+        if has_audio:
             print("🎯 提交音频到重试管理器...")
             
             # 生成任务ID（复用会话ID确保唯一性）
@@ -515,14 +646,23 @@ Gemini纠错: {gemini_correction_status}
             context.task_id = task_id
             context.report["task_id"] = task_id
             
+            # 提前量化为 int16，落盘与上传都直接复用这一份数据，避免再做 float32 拷贝；
+            # 先裁剪到 [-1, 1]，越界样本不会在转换时溢出回绕
+            if final_audio.dtype == np.float32:
+                scaled = np.clip(final_audio, -1.0, 1.0)
+                scaled *= 32767.0
+                audio_i16 = scaled.astype(np.int16)
+            else:
+                audio_i16 = final_audio
+
             # 提交到重试管理器，标记为强制立即处理（新录音覆盖机制）
             self.retry_manager.submit_audio(
-                audio_data=final_audio,
+                audio_data=audio_i16,
                 task_id=task_id,
                 force_immediate=True,  # 新录音强制立即处理
                 metadata={
                     "session_start": context.recording_started_at,
-                    "recording_duration": recording_time.duration_ms if recording_time else 0,
+                    "recording_duration": recording_duration_ms or 0,
                     "stop_reason": stop_reason
                 }
             )
@@ -531,9 +671,8 @@ Gemini纠错: {gemini_correction_status}
             print("⏳ 等待转录完成...")
             context.status = "processing"
             self.session_contexts[task_id] = context
-            if task_id in self.processing_order:
-                self.processing_order.remove(task_id)
-            self.processing_order.append(task_id)
+            self.processing_order[task_id] = None
+            self.processing_order.move_to_end(task_id)
             self.latest_task_id = task_id
             self.active_session = None
             
@@ -546,8 +685,6 @@ Gemini纠错: {gemini_correction_status}
 
     def _handle_short_recording_cancel(self, context: SessionContext, recorded_seconds: float, stop_reason: str):
         """处理录音时长不足的情况"""
-        min_duration = getattr(config, "MIN_TRANSCRIPTION_DURATION", 2.0)
-
         context.report["stop_reason"] = stop_reason
         context.report.setdefault("recording", {})["audio_seconds"] = recorded_seconds
         context.report["cancelled"] = True
@@ -563,139 +700,85 @@ Gemini纠错: {gemini_correction_status}
         original_transcript = (raw_transcript or "").strip()
         context.report["original_text"] = original_transcript
 
-        # 词典处理
-        context.timer.start("dictionary_processing")
-        transcript_data = [{'text': raw_transcript, 'start': 0.0, 'duration': 0.0}]
-        optimized_transcript = self.dictionary_manager.process_transcript(transcript_data)
-        dict_time = context.timer.stop("dictionary_processing")
+        # 词典处理（用户词典为空时整段跳过，不计时也不写词典报告）
+        replacement_count = 0
+        if self.dictionary_manager.user_dict:
+            dict_start = context.timer.mark("dictionary_processing_start")
+            transcript_data = [TranscriptSegment(raw_transcript)]
+            optimized_transcript = self.dictionary_manager.process_transcript(transcript_data)
+            duration_ms = (context.timer.mark("dictionary_processing_end") - dict_start) * 1000
+
+            dictionary_report = context.report.setdefault("dictionary", {})
+            if self._verbose:
+                print(f"⏱️  词典处理耗时: {self._format_duration_ms_value(duration_ms)}")
+            # 单次遍历同时统计替换次数与拼接文本
+            parts: List[str] = []
+            for entry in optimized_transcript:
+                replacement_count += len(entry.replacements)
+                if text := entry.text.strip():
+                    parts.append(text)
 
-        dictionary_report = context.report.setdefault("dictionary", {})
-        if dict_time:
-            duration_ms = dict_time.duration_ms
-            print(f"⏱️  词典处理耗时: {self._format_duration_ms_value(duration_ms)}")
             dictionary_report["duration_ms"] = duration_ms
-        dictionary_report["replacements"] = sum(len(entry.get('replacements', [])) for entry in optimized_transcript)
-        dictionary_report["enabled"] = getattr(config, "SEGMENT_ENABLE_DICTIONARY", True)
-
-        combined_text = ""
-        for entry in optimized_transcript:
-            text = entry.get('text', '').strip()
-            if text:
-                combined_text += text + " "
-        processed_text = combined_text.strip()
+            dictionary_report["replacements"] = replacement_count
+            dictionary_report["enabled"] = getattr(config, "SEGMENT_ENABLE_DICTIONARY", True)
+            processed_text = " ".join(parts)
+        else:
+            optimized_transcript = [TranscriptSegment(original_transcript)]
+            processed_text = original_transcript
         context.report["text"] = processed_text
 
-        # 剪贴板处理（仅限最新任务）
-        if processed_text and config.ENABLE_CLIPBOARD and self._is_latest_context(context):
-            context.timer.start("clipboard_copy")
-            try:
-                pyperclip.copy(processed_text)
-                clipboard_time = context.timer.stop("clipboard_copy")
-                clipboard_duration_ms = clipboard_time.duration_ms if clipboard_time else None
-                clipboard_report = context.report.setdefault("clipboard", {})
-                clipboard_report.update({
-                    "copied": True,
-                    "char_count": len(processed_text),
-                    "word_count": len(processed_text.split()),
-                    "duration_ms": clipboard_duration_ms,
-                    "mode": getattr(config, 'TEXT_INPUT_METHOD', 'clipboard')
-                })
-                if config.ENABLE_NOTIFICATIONS:
-                    notification_manager.show_clipboard_notification(processed_text, "Gemini转录")
-                elif clipboard_time:
-                    print(f"📋 转录结果已复制到剪贴板 ({self._format_duration_ms_value(clipboard_time.duration_ms)})")
-                else:
-                    print("📋 转录结果已复制到剪贴板")
-            except Exception as e:
-                context.timer.stop("clipboard_copy")
-                clipboard_report = context.report.setdefault("clipboard", {})
-                clipboard_report.update({
-                    "copied": False,
-                    "error": str(e)
-                })
-                if config.ENABLE_NOTIFICATIONS:
-                    notification_manager.show_error_notification(f"复制到剪贴板失败: {e}")
-                else:
-                    print(f"⚠️  复制到剪贴板失败: {e}")
+        # 本次处理中多次用到的配置只读取一次
+        clipboard_enabled = config.ENABLE_CLIPBOARD
+        correction_model = config.GEMINI_MODEL
+
+        # 剪贴板处理（仅限最新任务），复制在剪贴板线程中进行，不阻塞后续纠错
+        if processed_text and clipboard_enabled and self._is_latest_context(context):
+            self._copy_async(context, processed_text, _NOTIFY_TAG_TRANSCRIBE, "clipboard_copy")
 
-        # Gemini 纠错
+        # Gemini 纠错（命中缓存且有纠错结果时直接复用；短文本/已规整文本跳过）
         correction_applied = False
+        reuse_cached_correction = context.cache_hit and bool(context.cached_correction)
         if (config.ENABLE_GEMINI_CORRECTION and
-                config.GEMINI_MODEL != config.GEMINI_TRANSCRIPTION_MODEL and
-                processed_text):
-            print(f"🤖 使用 {config.GEMINI_MODEL} 进行纠错...")
-            context.timer.start("gemini_correction")
-            corrected_text = self.gemini_corrector.correct_transcript(processed_text)
-            correction_time = context.timer.stop("gemini_correction")
-
-            if corrected_text and corrected_text.strip() != processed_text:
-                optimized_transcript = [{
-                    'start': 0.0,
-                    'duration': 0.0,
-                    'text': corrected_text,
-                    'gemini_transcribed': True,
-                    'gemini_corrected': True
-                }]
+                self.gemini_corrector is not None and
+                correction_model != config.GEMINI_TRANSCRIPTION_MODEL and
+                processed_text and
+                (reuse_cached_correction or not self._should_skip_correction(processed_text))):
+            correction_start = context.timer.mark("gemini_correction_start")
+            if reuse_cached_correction:
+                corrected_text = context.cached_correction
+            else:
+                print(f"🤖 使用 {correction_model} 进行纠错...")
+                # 词典产生替换时文本受词典状态影响，不复用纠错缓存
+                corrected_text = self.gemini_corrector.correct_transcript(
+                    processed_text, use_cache=not replacement_count
+                )
+            correction_ms = (context.timer.mark("gemini_correction_end") - correction_start) * 1000
+
+            # 仅空白差异（换行、多余空格）不算实质修改，不覆盖剪贴板也不重复粘贴
+            if corrected_text and corrected_text.split() != processed_text.split():
+                optimized_transcript = [TranscriptSegment(corrected_text, gemini_corrected=True)]
                 correction_applied = True
-                if config.ENABLE_CLIPBOARD and self._is_latest_context(context):
-                    context.timer.start("clipboard_update")
-                    try:
-                        corrected_clean = corrected_text.strip()
-                        pyperclip.copy(corrected_clean)
-                        clipboard_update_time = context.timer.stop("clipboard_update")
-                        clipboard_update_duration = clipboard_update_time.duration_ms if clipboard_update_time else None
-                        clipboard_report = context.report.setdefault("clipboard", {})
-                        clipboard_report.update({
-                            "copied": True,
-                            "char_count": len(corrected_clean),
-                            "word_count": len(corrected_clean.split()),
-                            "duration_ms": clipboard_update_duration if clipboard_update_duration is not None else clipboard_report.get("duration_ms"),
-                            "mode": getattr(config, 'TEXT_INPUT_METHOD', 'clipboard'),
-                            "correction": True
-                        })
-                        if config.ENABLE_NOTIFICATIONS:
-                            notification_manager.show_clipboard_notification(corrected_clean, "纠错完成")
-                        elif correction_time and clipboard_update_time:
-                            print(
-                                f"✅ Gemini纠错完成 ({self._format_duration_ms_value(correction_time.duration_ms)})，"
-                                f"已更新剪贴板 ({self._format_duration_ms_value(clipboard_update_time.duration_ms)})"
-                            )
-                        else:
-                            print("✅ Gemini纠错完成，已更新剪贴板")
-                    except Exception as e:
-                        context.timer.stop("clipboard_update")
-                        clipboard_report = context.report.setdefault("clipboard", {})
-                        clipboard_report.update({
-                            "copied": False,
-                            "error": str(e)
-                        })
-                        if config.ENABLE_NOTIFICATIONS:
-                            notification_manager.show_error_notification(f"更新剪贴板失败: {e}")
-                        else:
-                            print(f"⚠️  更新剪贴板失败: {e}")
+                if clipboard_enabled and self._is_latest_context(context):
+                    self._copy_async(
+                        context, corrected_text.strip(), _NOTIFY_TAG_CORRECTED, "clipboard_update",
+                        correction_ms=correction_ms,
+                    )
                 else:
-                    if correction_time:
-                        print(f"✅ Gemini纠错完成 ({self._format_duration_ms_value(correction_time.duration_ms)})")
-                    else:
-                        print("✅ Gemini纠错完成")
+                    print(f"✅ Gemini纠错完成 ({self._format_duration_ms_value(correction_ms)})")
             else:
-                if correction_time:
-                    print(f"ℹ️  无需纠错 ({self._format_duration_ms_value(correction_time.duration_ms)})，剪贴板保持原始内容")
-                else:
-                    print("ℹ️  无需纠错，剪贴板保持原始内容")
+                print(f"ℹ️  无需纠错 ({self._format_duration_ms_value(correction_ms)})，剪贴板保持原始内容")
 
         context.report["correction_applied"] = correction_applied
         context.final_transcript = optimized_transcript
 
-        final_output_text = ""
-        for entry in optimized_transcript:
-            text = entry.get('text', '').strip()
-            if text:
-                if final_output_text:
-                    final_output_text += " "
-                final_output_text += text
+        # 未命中缓存时写入原始转录（词典处理前）与纠错结果，命中时仍重新套用当前词典
+        if context.audio_sha256 and not context.cache_hit and original_transcript:
+            corrected_for_cache = optimized_transcript[0].text.strip() if correction_applied else None
+            transcript_cache.put(context.audio_sha256, original_transcript, corrected_for_cache)
+
+        final_output_text = self._join_entry_texts(optimized_transcript)
 
-        final_clean = final_output_text.strip()
+        final_clean = final_output_text
         if not final_clean:
             final_clean = processed_text or ""
 
@@ -703,7 +786,7 @@ Gemini纠错: {gemini_correction_status}
             self._auto_paste_text(context, final_clean)
 
         if final_clean:
-            context.report["text"] = final_output_text.strip()
+            context.report["text"] = final_output_text
             context.transcript_text = final_clean
         else:
             fallback_text = original_transcript
@@ -713,8 +796,110 @@ Gemini纠错: {gemini_correction_status}
 
         return context.transcript_text
     
+    def _publish_transcript(self, text: str, tag: str, timer: Optional[Timer] = None,
+                            timer_name: Optional[str] = None) -> Optional[TimingResult]:
+        """复制文本到剪贴板并发送通知
+
+        同一会话内重复的文本不会再次写入剪贴板；复制失败时抛出异常由调用方处理。
+        传入 timer/timer_name 时在通知前停止计时，返回计时结果。
+        """
+        with self._pub_lock:
+            copied = text != self._last_clipboard
+            if copied:
+                copy_text(text)
+                self._last_clipboard = text
+        elapsed = timer.stop(timer_name) if timer and timer_name else None
+        if copied:
+            self._notify("show_clipboard_notification", text, tag)
+        return elapsed
+
+    def _copy_async(self, context: SessionContext, text: str, tag: str, timer_name: str,
+                    correction_ms: Optional[float] = None) -> None:
+        """提交剪贴板复制任务；复制与报告回写在同一任务内完成，等待该任务即可读取完整报告"""
+        context.timer.start(timer_name)
+        self._clipboard_future = self._clipboard_executor.submit(
+            self._copy_and_report, context, text, tag, timer_name, correction_ms
+        )
+
+    def _copy_and_report(self, context: SessionContext, text: str, tag: str, timer_name: str,
+                         correction_ms: Optional[float]) -> None:
+        """剪贴板线程：复制文本后更新会话报告并输出提示"""
+        correction = timer_name == "clipboard_update"
+        clipboard_report = context.report.setdefault("clipboard", {})
+        try:
+            clipboard_time = self._publish_transcript(text, tag, context.timer, timer_name)
+        except Exception as e:
+            context.timer.stop(timer_name)
+            clipboard_report.update({
+                "copied": False,
+                "error": str(e)
+            })
+            action = "更新剪贴板失败" if correction else "复制到剪贴板失败"
+            if config.ENABLE_NOTIFICATIONS:
+                self._notify("show_error_notification", f"{action}: {e}")
+            else:
+                print(f"⚠️  {action}: {e}")
+            return
+
+        duration_ms = clipboard_time.duration_ms if clipboard_time else None
+        clipboard_report.update({
+            "copied": True,
+            "char_count": len(text),
+            "word_count": len(text.split()),
+            "duration_ms": duration_ms if duration_ms is not None else clipboard_report.get("duration_ms"),
+            "mode": self._cfg_input_method_name
+        })
+        if correction:
+            clipboard_report["correction"] = True
+
+        if config.ENABLE_NOTIFICATIONS:
+            return
+        if not correction:
+            if clipboard_time:
+                print(f"📋 转录结果已复制到剪贴板 ({self._format_duration_ms_value(clipboard_time.duration_ms)})")
+            else:
+                print("📋 转录结果已复制到剪贴板")
+        elif correction_ms is not None and clipboard_time:
+            print(
+                f"✅ Gemini纠错完成 ({self._format_duration_ms_value(correction_ms)})，"
+                f"已更新剪贴板 ({self._format_duration_ms_value(clipboard_time.duration_ms)})"
+            )
+        else:
+            print("✅ Gemini纠错完成，已更新剪贴板")
+
+    def _notify(self, kind: str, *args: Any) -> None:
+        """异步调用 notification_manager 的 show_* 方法"""
+        if not config.ENABLE_NOTIFICATIONS:
+            return
+        try:
+            self._notify_executor.submit(self._deliver_notification, kind, args)
+        except RuntimeError:
+            # 应用关闭后执行器已停止，丢弃通知
+            pass
+
+    @staticmethod
+    def _deliver_notification(kind: str, args: tuple) -> None:
+        try:
+            getattr(notification_manager, kind)(*args)
+        except Exception as exc:
+            if config.DEBUG_MODE:
+                print(f"通知发送失败: {exc}")
+
+    def _wait_for_clipboard(self, timeout: float = 1.0) -> None:
+        """等待尚未完成的剪贴板复制，避免与自动粘贴互相覆盖"""
+        future = self._clipboard_future
+        if future is None:
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
     def _finalize_context(self, context: SessionContext, final_text: Optional[str], failure_reason: Optional[str] = None):
         """完成会话处理并输出总结"""
+        # 报告依赖剪贴板线程回写的结果
+        self._wait_for_clipboard()
+
         if failure_reason:
             context.failure_reason = failure_reason
             context.report["failure"] = failure_reason
@@ -746,25 +931,24 @@ Gemini纠错: {gemini_correction_status}
 
         if context.task_id and context.task_id in self.session_contexts:
             del self.session_contexts[context.task_id]
-        if context.task_id and context.task_id in self.processing_order:
-            self.processing_order.remove(context.task_id)
+        if context.task_id:
+            self.processing_order.pop(context.task_id, None)
 
         if self.active_session and self.active_session.session_id == context.session_id:
             self.active_session = None
 
-        self.state = AppState.IDLE
-        self.recording_start_time = None
+        # 后台任务收尾时用户可能已开始新录音，只从处理中切回待机，不覆盖录音状态
+        if self._transition(AppState.PROCESSING, AppState.IDLE):
+            self.recording_start_time = None
         summary_duration = context.report.get("total_duration_ms")
-        print(f"\n{'='*50}")
         duration_text = self._format_duration_ms_value(summary_duration)
         if failure_reason:
-            print(f"❌ 任务 {context.session_id} 处理完成（失败: {failure_reason}，耗时 {duration_text}）")
+            status_line = f"❌ 任务 {context.session_id} 处理完成（失败: {failure_reason}，耗时 {duration_text}）"
         elif context.status == "cancelled":
-            print(f"⚠️  任务 {context.session_id} 已取消，耗时 {duration_text}")
+            status_line = f"⚠️  任务 {context.session_id} 已取消，耗时 {duration_text}"
         else:
-            print(f"✅ 任务 {context.session_id} 处理完成，耗时 {duration_text}")
-        print("等待下次录音...")
-        print(f"{'='*50}\n")
+            status_line = f"✅ 任务 {context.session_id} 处理完成，耗时 {duration_text}"
+        _write_lines(["\n" + _SEP50, status_line, "等待下次录音...", _SEP50 + "\n"])
 
     def _finalize_session_with_failure(self, context: SessionContext, reason: str):
         """快捷处理失败会话"""
@@ -773,9 +957,32 @@ Gemini纠错: {gemini_correction_status}
         context.status = "failed"
         self._finalize_context(context, context.transcript_text, reason)
 
+    def _complete_session(self) -> None:
+        """会话处理线程：停止会话并完成收尾"""
+        try:
+            self.session_manager.stop_session()
+            self._finish_session()
+        except Exception as exc:
+            print(f"❌ 会话处理异常: {exc}")
+            if config.DEBUG_MODE:
+                traceback.print_exc()
+            self._transition(AppState.PROCESSING, AppState.IDLE)
+        finally:
+            self.recording_start_time = None
+
+    def _wait_for_session_pipeline(self) -> None:
+        """等待尚未完成的会话后台处理"""
+        future = self._session_future
+        if future is None:
+            return
+        try:
+            future.result()
+        except Exception:
+            pass
+
     def _finish_session(self):
         """兼容新会话模式的收尾逻辑"""
-        self.state = AppState.IDLE
+        self._transition(AppState.PROCESSING, AppState.IDLE)
         if not self.use_new_session_mode or not hasattr(self, 'session_manager'):
             return
 
@@ -784,49 +991,44 @@ Gemini纠错: {gemini_correction_status}
             print("🔚 会话结束，未获取到分段结果")
             return
 
-        full_text = ""
-        for segment in segments:
-            if hasattr(segment, 'final_text') and segment.final_text:
-                full_text += segment.final_text + " "
-
-        full_text = full_text.strip()
-        print(f"✅ 会话处理完成，共 {len(segments)} 个分段")
+        full_text = " ".join(t for segment in segments if (t := getattr(segment, 'final_text', None)))
+        lines = [f"✅ 会话处理完成，共 {len(segments)} 个分段"]
         if full_text:
-            print("-" * 60)
-            print(full_text)
-            print("-" * 60)
+            lines.extend((_BORDER_LIGHT, full_text, _BORDER_LIGHT))
+        _write_lines(lines)
+
+        # 剪贴板写入、通知与自动粘贴都可能阻塞数十到数百毫秒，交给剪贴板线程执行，
+        # 热键动作线程立即返回以响应下一次按键
+        self._clipboard_executor.submit(self._publish_session_text, full_text)
+
+    def _publish_session_text(self, full_text: str) -> None:
+        """会话模式收尾：复制会话文本、发送通知并尝试自动粘贴（在剪贴板线程中执行）"""
         if config.ENABLE_CLIPBOARD:
             try:
-                pyperclip.copy(full_text)
-                if config.ENABLE_NOTIFICATIONS:
-                    notification_manager.show_clipboard_notification(full_text, "会话完成")
+                copy_text(full_text)
+                self._notify("show_clipboard_notification", full_text, _NOTIFY_TAG_SESSION)
             except Exception as exc:
                 print(f"⚠️ 会话结果复制剪贴板失败: {exc}")
 
         # 一口气模式下也尝试自动粘贴最终文本
-        if full_text and getattr(config, 'AUTO_PASTE_ENABLED', True):
-            context = None
-            if self.latest_task_id:
-                context = self.session_contexts.get(self.latest_task_id)
-
-            if not context and self.processing_order:
-                for task_id in reversed(self.processing_order):
-                    possible = self.session_contexts.get(task_id)
-                    if possible:
-                        context = possible
-                        break
-
-            if not context and self.session_contexts:
-                context = next(iter(self.session_contexts.values()))
+        if full_text and self._cfg_autopaste:
+            # session_contexts 与 processing_order 同步增删且按提交顺序排列，最后一项即最近的存活任务
+            context = self.session_contexts.get(self.latest_task_id) if self.latest_task_id else None
+            if not context:
+                context = next(reversed(self.session_contexts.values()), None)
 
             if not context:
                 context = SessionContext(
-                    session_id=f"session_autopaste_{int(time.time() * 1000)}",
+                    session_id=f"session_autopaste_{next(self._request_ids)}",
                     task_id=self.latest_task_id or None,
                     timer=Timer(),
                 )
 
-            pasted = self._auto_paste_text(context, full_text, force=True)
+            try:
+                pasted = self._auto_paste_text(context, full_text, force=True)
+            except Exception as exc:
+                print(f"⚠️ 会话结果自动粘贴失败: {exc}")
+                return
             if pasted:
                 context.last_autopaste_text = full_text
                 self._global_last_autopaste_text = full_text
@@ -837,9 +1039,14 @@ Gemini纠错: {gemini_correction_status}
             return False
 
         cleaned = (text or "").strip()
-        if not cleaned or not getattr(config, 'AUTO_PASTE_ENABLED', True):
+        method = self._cfg_input_method
+        if not cleaned or not self._cfg_autopaste or method is None:
             return False
 
+        # 先按原始文本去重，重复粘贴无需创建输入管理器或清理文本
+        if cleaned in (context.last_autopaste_text, self._global_last_autopaste_text):
+            return True
+
         manager = getattr(self, 'text_input_manager', None)
         if not manager:
             try:
@@ -849,14 +1056,6 @@ Gemini纠错: {gemini_correction_status}
                 print(f"⚠️ 自动粘贴初始化失败: {exc}")
                 return False
 
-        method_str = getattr(config, 'TEXT_INPUT_METHOD', 'clipboard')
-        if method_str == 'direct_type':
-            method = InputMethod.DIRECT_TYPE
-        elif method_str == 'clipboard':
-            method = InputMethod.CLIPBOARD_PASTE
-        else:
-            return False
-
         sanitized = cleaned
         if method == InputMethod.CLIPBOARD_PASTE and hasattr(manager, '_sanitize_clipboard_text'):
             try:
@@ -866,22 +1065,27 @@ Gemini纠错: {gemini_correction_status}
             except Exception:
                 sanitized = cleaned
 
-        if context.last_autopaste_text and context.last_autopaste_text == sanitized:
-            return True
-        if self._global_last_autopaste_text and self._global_last_autopaste_text == sanitized:
-            return True
+        # 自动粘贴会读取并恢复剪贴板，需先等待剪贴板线程写入完成
+        self._wait_for_clipboard()
 
-        request = InputRequest(
+        request = replace(
+            self._paste_request_template,
             text=sanitized,
-            method=method,
-            delay_before=max(getattr(config, 'TEXT_INPUT_DELAY', 0.1), 0.1),
-            delay_after=0.1,
-            backup_to_clipboard=True,
-            request_id=f"auto_paste_{int(time.time() * 1000)}"
+            request_id=f"auto_paste_{next(self._request_ids)}",
         )
 
         result = manager.input_text(request)
         autopaste_report = context.report.setdefault("autopaste", {})
+        if result == InputResult.PARTIAL:
+            # 已输入开头部分，视为已粘贴，避免后续再次整段粘贴造成重复；剩余文本已在剪贴板
+            autopaste_report.update({
+                "performed": True,
+                "partial": True,
+                "method": method.name.lower()
+            })
+            context.last_autopaste_text = cleaned
+            self._global_last_autopaste_text = cleaned
+            return True
         if result != InputResult.SUCCESS:
             print(f"⚠️ 自动粘贴失败: {result.value}")
             autopaste_report.update({
@@ -891,8 +1095,8 @@ Gemini纠错: {gemini_correction_status}
             })
             return False
 
-        context.last_autopaste_text = sanitized
-        self._global_last_autopaste_text = sanitized
+        context.last_autopaste_text = cleaned
+        self._global_last_autopaste_text = cleaned
         autopaste_report.update({
             "performed": True,
             "method": method.name.lower()
@@ -902,27 +1106,26 @@ Gemini纠错: {gemini_correction_status}
     def _display_final_results(self, context: SessionContext):
         """显示最终转录结果"""
         report = context.report or {}
-        border = "═" * 60
-        print(f"\n{border}")
-        print(f"🎯 会话报告".center(60))
-        print(border)
+        sections = {key: report.get(key) or _EMPTY_SECTION for key in _SUMMARY_SECTIONS}
+        lines = ["\n" + _BORDER_HEAVY, _SESSION_TITLE, _BORDER_HEAVY]
 
         if report.get("cancelled"):
-            print(f"⚠️  会话已取消: 录音时长不足 ({report.get('stop_reason', '未知原因')})")
-            print(border)
+            lines.append(f"⚠️  会话已取消: 录音时长不足 ({report.get('stop_reason', '未知原因')})")
+            lines.append(_BORDER_HEAVY)
+            _write_lines(lines)
             return
 
         failure = report.get("failure") or context.failure_reason
         if failure:
-            print(f"❌ 转录失败: {failure}")
+            lines.append(f"❌ 转录失败: {failure}")
 
         task_id = report.get("task_id") or context.task_id or "-"
         stop_reason = report.get("stop_reason") or "-"
         total_duration = self._format_duration_ms_value(report.get("total_duration_ms"))
-        print(f"🆔 任务: {task_id} · 结束方式: {stop_reason}")
-        print(f"⏱️ 总耗时: {total_duration}")
+        lines.append(f"🆔 任务: {task_id} · 结束方式: {stop_reason}")
+        lines.append(f"⏱️ 总耗时: {total_duration}")
 
-        recording_info = report.get("recording", {})
+        recording_info = sections["recording"]
         rec_duration = self._format_duration_ms_value(recording_info.get("timer_duration_ms"))
         rec_audio_seconds = self._format_seconds_float(recording_info.get("audio_seconds"))
         rec_chunks = recording_info.get("chunk_count")
@@ -937,9 +1140,9 @@ Gemini纠错: {gemini_correction_status}
         ]
         rec_line = self._join_summary_parts(rec_parts)
         if rec_line:
-            print(f"🎙️ {rec_line}")
+            lines.append(f"🎙️ {rec_line}")
 
-        trans_info = report.get("transcription", {})
+        trans_info = sections["transcription"]
         trans_duration = self._format_duration_ms_value(trans_info.get("duration_ms"))
         compressed = trans_info.get("compressed_kb")
         attempts = trans_info.get("api_attempts") or 0
@@ -955,9 +1158,9 @@ Gemini纠错: {gemini_correction_status}
         ]
         trans_line = self._join_summary_parts(trans_parts)
         if trans_line:
-            print(f"🤖 {trans_line}")
+            lines.append(f"🤖 {trans_line}")
 
-        dictionary_info = report.get("dictionary", {})
+        dictionary_info = sections["dictionary"]
         dict_duration = self._format_duration_ms_value(dictionary_info.get("duration_ms"))
         replacements = dictionary_info.get("replacements") or 0
         if dictionary_info:
@@ -967,9 +1170,9 @@ Gemini纠错: {gemini_correction_status}
             ]
             dict_line = self._join_summary_parts(dict_parts)
             if dict_line:
-                print(f"📚 词典优化 | {dict_line}")
+                lines.append(f"📚 词典优化 | {dict_line}")
 
-        clipboard_info = report.get("clipboard", {})
+        clipboard_info = sections["clipboard"]
         if clipboard_info:
             clip_status = "已复制" if clipboard_info.get("copied") else "失败"
             clip_duration = self._format_duration_ms_value(clipboard_info.get("duration_ms"))
@@ -984,111 +1187,60 @@ Gemini纠错: {gemini_correction_status}
             ]
             clip_line = self._join_summary_parts(clip_parts)
             if clip_line:
-                print(f"📋 剪贴板 | {clip_line}")
+                lines.append(f"📋 剪贴板 | {clip_line}")
 
-        autopaste_info = report.get("autopaste", {})
+        autopaste_info = sections["autopaste"]
         if autopaste_info.get("performed"):
             method = autopaste_info.get('method') or 'unknown'
-            print(f"✍️ 自动粘贴 | 成功 · 方法 {method}")
+            lines.append(f"✍️ 自动粘贴 | 成功 · 方法 {method}")
         elif autopaste_info:
-            print(f"✍️ 自动粘贴 | 失败 · {autopaste_info.get('error')}")
+            lines.append(f"✍️ 自动粘贴 | 失败 · {autopaste_info.get('error')}")
 
         final_text = report.get("text") or self._collect_final_text_fallback(context)
 
         if final_text:
-            print("-" * 60)
-            print(final_text)
-            print("-" * 60)
+            lines.extend((_BORDER_LIGHT, final_text, _BORDER_LIGHT))
             if config.DEBUG_MODE:
-                self._show_replacement_stats(context)
+                lines.extend(self._replacement_stats_lines(context))
         else:
-            print("❌ 未获取到转录结果")
-            print("可能原因: 录音过短 / 音频质量不足 / 网络异常")
+            lines.append("❌ 未获取到转录结果")
+            lines.append("可能原因: 录音过短 / 音频质量不足 / 网络异常")
 
-        print(border)
+        lines.append(_BORDER_HEAVY)
+        _write_lines(lines)
 
-    def _show_replacement_stats(self, context: SessionContext):
-        """显示词典替换统计"""
-        if not context.final_transcript:
-            return
-        
-        total_replacements = 0
-        replacement_details = []
-        
-        for entry in context.final_transcript:
-            if 'replacements' in entry:
-                for repl in entry['replacements']:
-                    total_replacements += 1
-                    replacement_details.append(
-                        f"  {repl['original']} → {repl['replacement']} "
-                        f"(相似度: {repl['similarity']:.2f})"
-                    )
-        
-        if total_replacements > 0:
-            print(f"\n🔄 词典替换统计 (共 {total_replacements} 处):")
-            for detail in replacement_details:
-                print(detail)
+    def _replacement_stats_lines(self, context: SessionContext) -> List[str]:
+        """生成词典替换统计行"""
+        if not context.final_transcript or not self.dictionary_manager.user_dict:
+            return []
+
+        details = [
+            f"  {repl['original']} → {repl['replacement']} (相似度: {repl['similarity']:.2f})"
+            for entry in context.final_transcript
+            for repl in entry.replacements
+        ]
+        if details:
+            return [f"\n🔄 词典替换统计 (共 {len(details)} 处):", *details]
+        return []
     
     def _display_timing_summary(self, context: SessionContext):
-        """显示计时统计摘要"""
-        if config.DEBUG_MODE:
-            context.timer.print_summary("⏱️  处理时间分析")
-        else:
-            timings = context.timer.get_all_timings()
-            if timings:
-                print(f"\n⏱️  处理时间:")
-                for name, timing in timings.items():
-                    if name in ["recording", "gemini_transcription", "gemini_correction"]:
-                        print(f"  {self._format_timing_name(name)}: {self._format_duration_ms_value(timing.duration_ms)}")
-    
-    def _format_timing_name(self, name: str) -> str:
-        """格式化计时器名称显示"""
-        name_map = {
-            "recording": "录音时长",
-            "gemini_transcription": "Gemini转录",
-            "gemini_correction": "Gemini纠错",
-            "dictionary_processing": "词典处理",
-            "clipboard_copy": "剪贴板复制",
-            "clipboard_update": "剪贴板更新",
-            "total_session": "总计时间"
-        }
-        return name_map.get(name, name)
+        """显示计时统计摘要（仅调试模式下由 _finalize_context 调用）"""
+        context.timer.print_summary("⏱️  处理时间分析")
     
     @staticmethod
     def _format_duration_ms_value(duration_ms: Optional[float]) -> str:
         """将毫秒格式化为易读文本"""
         if duration_ms is None:
             return "-"
-        if duration_ms < 1000:
-            return f"{duration_ms:.1f}ms"
-        return f"{duration_ms/1000:.2f}s ({duration_ms:.1f}ms)"
-
-    def _format_duration(self, seconds: int) -> str:
-        """格式化时长显示"""
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        
-        if hours > 0:
-            return f"{hours}小时{minutes}分钟{secs}秒"
-        elif minutes > 0:
-            return f"{minutes}分钟{secs}秒"
-        else:
-            return f"{secs}秒"
+        # 按显示精度（0.1ms）取整作为缓存键，提高命中率
+        return _format_ms(round(duration_ms, 1))
 
-    def _format_seconds_float(self, seconds: Optional[float]) -> str:
+    @staticmethod
+    def _format_seconds_float(seconds: Optional[float]) -> str:
         """格式化浮点秒"""
         if seconds is None or seconds <= 0:
             return "-"
-        if seconds < 60:
-            return f"{seconds:.2f}s"
-        minutes = int(seconds // 60)
-        secs = seconds % 60
-        if minutes < 60:
-            return f"{minutes}分{secs:.1f}秒"
-        hours = minutes // 60
-        minutes = minutes % 60
-        return f"{hours}小时{minutes}分{secs:.0f}秒"
+        return _format_seconds(seconds)
 
     def _format_strategy(self, strategy: Optional[str], payload: Optional[str]) -> Optional[str]:
         """格式化转录策略"""
@@ -1108,56 +1260,54 @@ Gemini纠错: {gemini_correction_status}
         filtered = [part for part in parts if part]
         return " | ".join(filtered)
 
+    @staticmethod
+    def _should_skip_correction(text: str) -> bool:
+        """文本过短或缺少有效文字时跳过 Gemini 二次纠错"""
+        if len(text) < config.MIN_CORRECTION_LENGTH:
+            return True
+        return _WORD_RUN_RE.search(text) is None
+
+    @staticmethod
+    def _join_entry_texts(entries: List[TranscriptSegment]) -> str:
+        """拼接转录条目文本；单条目（传统模式常态）直接返回，不再走生成器"""
+        if len(entries) == 1:
+            return entries[0].text.strip()
+        return " ".join(t for entry in entries if (t := entry.text.strip()))
+
     def _collect_final_text_fallback(self, context: SessionContext) -> str:
         """从最终转录结构提取文本"""
         if not context.final_transcript:
             return ""
-        full_text = ""
-        for entry in context.final_transcript:
-            text = entry.get('text', '').strip()
-            if text:
-                if full_text:
-                    full_text += " "
-                full_text += text
-        return full_text
+        return self._join_entry_texts(context.final_transcript)
     
-    # 超时监控相关方法（与原版相同）
+    # 超时监控相关方法
     def _start_timeout_monitoring(self):
-        """启动超时监控线程"""
-        if self.timeout_thread is not None and self.timeout_thread.is_alive():
-            return
-        
-        self.timeout_thread = threading.Thread(target=self._timeout_monitor_worker, daemon=True)
-        self.timeout_thread.start()
+        """启动录音警告与超时定时器（到点各触发一次，无需轮询）"""
+        self._stop_timeout_monitoring()
+
+        self._warn_timer = threading.Timer(
+            config.WARNING_RECORDING_DURATION,
+            self._show_recording_warning,
+            args=[config.WARNING_RECORDING_DURATION],
+        )
+        self._warn_timer.daemon = True
+        self._warn_timer.start()
+
+        self._timeout_timer = threading.Timer(
+            config.MAX_RECORDING_DURATION,
+            self._handle_recording_timeout,
+            args=[config.MAX_RECORDING_DURATION],
+        )
+        self._timeout_timer.daemon = True
+        self._timeout_timer.start()
     
     def _stop_timeout_monitoring(self):
-        """停止超时监控"""
-        if self.timeout_thread is not None:
-            self.timeout_stop_event.set()
-            if self.timeout_thread.is_alive():
-                self.timeout_thread.join(timeout=1.0)
-    
-    def _timeout_monitor_worker(self):
-        """超时监控工作线程"""
-        while not self.timeout_stop_event.is_set() and self.state == AppState.RECORDING:
-            if self.recording_start_time is None:
-                break
-            
-            current_time = time.time()
-            elapsed_time = current_time - self.recording_start_time
-            
-            # 检查是否需要显示警告
-            if not self.warning_shown and elapsed_time >= config.WARNING_RECORDING_DURATION:
-                self._show_recording_warning(elapsed_time)
-                self.warning_shown = True
-            
-            # 检查是否超时
-            if elapsed_time >= config.MAX_RECORDING_DURATION:
-                self._handle_recording_timeout(elapsed_time)
-                break
-            
-            # 等待检查间隔或停止事件
-            self.timeout_stop_event.wait(config.TIMEOUT_CHECK_INTERVAL)
+        """取消录音警告与超时定时器"""
+        for timer in (self._warn_timer, self._timeout_timer):
+            if timer is not None:
+                timer.cancel()
+        self._warn_timer = None
+        self._timeout_timer = None
     
     def _show_recording_warning(self, elapsed_time: int):
         """显示录音时长警告"""
@@ -1167,23 +1317,15 @@ Gemini纠错: {gemini_correction_status}
     
     def _handle_recording_timeout(self, elapsed_time: int):
         """处理录音超时"""
-        elapsed_text = self._format_duration(int(elapsed_time))
+        elapsed_text = _format_duration(int(elapsed_time))
         timeout_msg = f"🚨 录音超时: 已录音 {elapsed_text}，自动停止录音"
         print(f"\n{timeout_msg}")
         
         # 发送超时通知
-        if config.ENABLE_NOTIFICATIONS:
-            try:
-                notification_manager.show_error_notification(timeout_msg)
-            except:
-                pass
+        self._notify("show_error_notification", timeout_msg)
         
-        # 自动停止录音
-        should_stop = False
-        with self.state_lock:
-            if self.state == AppState.RECORDING:
-                should_stop = True
-        if should_stop:
+        # 自动停止录音（是否仍在录音由 _stop_recording 的状态切换判定）
+        if self.state == AppState.RECORDING:
             self._schedule_action(lambda: self._stop_recording(auto_stopped=True))
     
     # ==================== 重试管理器回调函数 ====================
@@ -1199,49 +1341,61 @@ Gemini纠错: {gemini_correction_status}
             timer = context.timer if context else self.timer
             report = context.report.setdefault("transcription", {}) if context else {}
 
-            # 开始转录计时
-            timer.start("gemini_transcription")
             audio_seconds = 0.0
             if audio_data is not None and hasattr(audio_data, "__len__"):
                 audio_seconds = len(audio_data) / float(getattr(config, "SAMPLE_RATE", 16000))
             if context:
                 report["audio_seconds"] = audio_seconds
-            
-            # 调用 Gemini 转录
-            transcript = self.transcriber.transcribe_complete_audio(audio_data)
-            
-            # 停止转录计时
-            gemini_time = timer.stop("gemini_transcription")
-            if gemini_time:
-                duration_ms = gemini_time.duration_ms
-                if context:
-                    report["duration_ms"] = duration_ms
+                # 缓存键在重试管理器工作线程中计算（每个会话一次），不占用热键处理线程
+                if transcript_cache.enabled and context.audio_sha256 is None and audio_data is not None:
+                    context.audio_sha256 = TranscriptCache.make_key(audio_data)
+
+            # 转录计时（异常时 track 同样会记录耗时）
+            with timer.track("gemini_transcription") as gemini_time:
+                # 命中转录缓存时跳过 Gemini 调用
+                cached = None
+                if context and context.audio_sha256:
+                    cached = transcript_cache.get(context.audio_sha256)
+                if cached:
+                    transcript, context.cached_correction = cached
+                    context.cache_hit = True
+                    report["strategy"] = "cache"
+                    print("♻️ 命中转录缓存，跳过 Gemini 转录")
+                else:
+                    # 调用 Gemini 转录
+                    transcript = self.transcriber.transcribe_complete_audio(audio_data)
+
+            duration_ms = gemini_time.duration_ms
+            if context:
+                report["duration_ms"] = duration_ms
+            if self._verbose:
                 print(f"⏱️  Gemini转录耗时: {self._format_duration_ms_value(duration_ms)}")
 
             # 记录本次转录的其他信息
             run_info = getattr(self.transcriber, "last_run_info", {}) or {}
-            if context:
-                for key in ["strategy", "compressed_kb", "transcript_chars", "api_attempts", "payload_type", "chunks_total", "chunks_success", "model"]:
-                    if key in run_info:
-                        report[key] = run_info.get(key)
+            if context and not context.cache_hit:
+                report.update({k: v for k, v in run_info.items() if k in _RUN_INFO_KEYS})
             
             return transcript
             
         except Exception as e:
-            try:
-                timer.stop("gemini_transcription")
-            except Exception:
-                pass
             print(f"❌ 转录回调异常: {e}")
             return None
     
+    def _resolve_context(self, task_id: str) -> Optional[SessionContext]:
+        """按任务ID查找会话上下文，未登记时回退到仍在进行中的活跃会话"""
+        context = self.session_contexts.get(task_id)
+        if context is None:
+            active = self.active_session
+            if active is not None and active.session_id == task_id:
+                context = active
+        return context
+
     def _on_transcription_success(self, task_id: str, transcript: str):
         """转录成功回调"""
         print(f"✅ 任务 {task_id} 转录成功")
 
-        context = self.session_contexts.get(task_id)
-        if not context and self.active_session and self.active_session.session_id == task_id:
-            context = self.active_session
+        context = self._resolve_context(task_id)
 
         if not transcript:
             print("⚠️ 转录结果为空，跳过自动粘贴")
@@ -1254,7 +1408,7 @@ Gemini纠错: {gemini_correction_status}
             final_text = self._process_transcript_result(context, transcript)
 
             if not self._is_latest_context(context):
-                print("📦 历史队列任务完成：结果已写入 history.json，未触发自动粘贴")
+                print("📦 历史队列任务完成：结果已写入 history.jsonl，未触发自动粘贴")
 
             self._finalize_context(context, final_text)
             return
@@ -1262,10 +1416,8 @@ Gemini纠错: {gemini_correction_status}
         # 无上下文的兼容处理（如旧版本遗留任务）
         if transcript and config.ENABLE_CLIPBOARD:
             try:
-                pyperclip.copy(transcript)
-                if config.ENABLE_NOTIFICATIONS:
-                    notification_manager.show_clipboard_notification(transcript, "重试转录成功")
-                else:
+                self._publish_transcript(transcript, _NOTIFY_TAG_RETRY)
+                if not config.ENABLE_NOTIFICATIONS:
                     print(f"📋 重试结果已复制到剪贴板: {transcript}")
             except Exception as e:
                 print(f"⚠️  复制重试结果失败: {e}")
@@ -1274,19 +1426,16 @@ Gemini纠错: {gemini_correction_status}
         """转录失败回调"""
         print(f"❌ 任务 {task_id} 最终失败: {error_message}")
 
-        context = self.session_contexts.get(task_id)
-        if not context and self.active_session and self.active_session.session_id == task_id:
-            context = self.active_session
+        context = self._resolve_context(task_id)
 
         if context:
             context.failure_reason = error_message
             if not self._is_latest_context(context):
-                print("📦 历史队列任务失败：错误信息已写入 history.json")
+                print("📦 历史队列任务失败：错误信息已写入 history.jsonl")
             self._finalize_context(context, context.transcript_text, error_message)
             return
 
-        if config.ENABLE_NOTIFICATIONS:
-            notification_manager.show_error_notification(f"音频转录最终失败: {error_message}")
+        self._notify("show_error_notification", f"音频转录最终失败: {error_message}")
     
     # ==================== 原有方法 ====================
     
@@ -1309,8 +1458,6 @@ Gemini纠错: {gemini_correction_status}
                         print(f"通知发送失败: {exc}")
             return False
         
-        self.running = True
-        
         # 根据模式启动相应服务
         if self.use_new_session_mode:
             # 新会话模式不需要额外启动服务，会话管理器会按需启动
@@ -1318,6 +1465,10 @@ Gemini纠错: {gemini_correction_status}
         else:
             # 传统模式启动重试管理器
             self.retry_manager.start()
+
+            # 在后台预热 Gemini 上下文缓存并定期续期，不阻塞启动
+            if config.GEMINI_CONTEXT_CACHE_ENABLED:
+                threading.Thread(target=self._context_cache_refresher, name="ContextCacheRefresher", daemon=True).start()
         
         # 启动快捷键监听
         if not self.hotkey_listener.start():
@@ -1349,19 +1500,15 @@ Gemini纠错: {gemini_correction_status}
             for key, value in transcriber_info.items():
                 print(f"  {key}: {value}")
         
+        # 调试状态输出放在独立线程，主线程只等待退出事件
+        if config.DEBUG_MODE:
+            threading.Thread(target=self._status_printer, name="StatusPrinter", daemon=True).start()
+
         try:
-            # 主循环
-            while self.running:
-                time.sleep(1)
-
-                now = time.time()
-                if now - self._last_hotkey_health_check >= 3.0:
-                    self._last_hotkey_health_check = now
-                    self.hotkey_listener.ensure_running()
-                
-                # 显示状态
-                if config.DEBUG_MODE:
-                    print(f"\r状态: {self.state.value}", end='', flush=True)
+            # 主循环：阻塞等待退出事件，顺带每 3 秒检查热键监听健康状态
+            while not self._shutdown_event.wait(3.0):
+                self._last_hotkey_health_check = time.time()
+                self.hotkey_listener.ensure_running()
         
         except KeyboardInterrupt:
             print(f"\n\n收到退出信号...")
@@ -1371,11 +1518,36 @@ Gemini纠错: {gemini_correction_status}
         
         return True
     
+    def _context_cache_refresher(self) -> None:
+        """预热并定期续期 Gemini 上下文缓存，提示词静态部分变化时重建"""
+        try:
+            self.transcriber.prime_context_cache()
+        except Exception as exc:
+            if config.DEBUG_MODE:
+                print(f"⚠️ 上下文缓存预热异常: {exc}")
+        interval = config.GEMINI_CONTEXT_CACHE_REFRESH_INTERVAL
+        while not self._shutdown_event.wait(interval):
+            try:
+                self.transcriber.refresh_context_cache()
+            except Exception as exc:
+                if config.DEBUG_MODE:
+                    print(f"⚠️ 上下文缓存续期异常: {exc}")
+
+    def _status_printer(self) -> None:
+        """调试模式下仅在状态变化时重绘状态行"""
+        state = self.state
+        while state is not None:
+            sys.stdout.write(f"\r状态: {state.label}\x1b[K")
+            sys.stdout.flush()
+            state = self._state_events.get()
+
     def stop(self):
         """停止应用"""
         print("正在关闭应用...")
 
-        self.running = False
+        self._shutdown_event.set()
+        if self._state_events is not None:
+            self._state_events.put(None)
 
         if self.correction_hotkey_active:
             stop_hotkey_listener()
@@ -1403,34 +1575,46 @@ Gemini纠错: {gemini_correction_status}
             
             # 停止重试管理器
             self.retry_manager.stop()
+            transcript_cache.close()
         
+        # 会话模式下停止录音后的收尾任务已提交到流水线线程，等待其完成，避免丢弃退出时的录音；
+        # 收尾会用到剪贴板与通知线程，因此先于它们关闭
+        self._pipeline_pool.shutdown(wait=True)
+        self._clipboard_executor.shutdown(wait=False, cancel_futures=True)
+        self._notify_executor.shutdown(wait=False, cancel_futures=True)
+        notification_manager.close()
+
         if not self._action_dispatcher_stop.is_set():
             self._action_dispatcher_stop.set()
-            self._action_queue.put(None)
+            self._action_deque.append(None)
+            self._action_wake.set()
             try:
                 self._action_worker.join(timeout=1.0)
             except RuntimeError:
                 pass
 
+        self.history_store.close()
+
         print("✅ 应用已关闭")
 
 
-def signal_handler(sig, frame):
-    """信号处理器"""
+def signal_handler(app: GeminiVoiceTranscriptionApp, sig, frame):
+    """信号处理器：唤醒主循环，由 start() 的 finally 负责清理"""
     print(f"\n收到信号 {sig}，正在退出...")
-    sys.exit(0)
+    app._shutdown_event.set()
 
 
 def main():
     """主函数"""
-    # 注册信号处理器
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     print("📱 使用传统一口气模式")
 
     # 创建并启动应用
     app = GeminiVoiceTranscriptionApp()
+
+    # 注册信号处理器
+    handler = functools.partial(signal_handler, app)
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
     
     try:
         success = app.start()
@@ -1439,7 +1623,6 @@ def main():
     except Exception as e:
         print(f"❌ 应用运行错误: {e}")
         if config.DEBUG_MODE:
-            import traceback
             traceback.print_exc()
         sys.exit(1)
 
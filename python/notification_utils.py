@@ -5,22 +5,97 @@
 """
 
 import os
+import platform
+import queue
+import shutil
 import subprocess
+import sys
 import threading
 import time
-from typing import Optional, Callable
+from typing import Any, Callable, Dict, Optional
 from pathlib import Path
 import config
 
+# 当前操作系统平台（模块加载时检测一次）: macos / windows / linux / unknown
+PLATFORM = {'darwin': 'macos', 'windows': 'windows', 'linux': 'linux'}.get(platform.system().lower(), 'unknown')
+
+# 通知标题常量（避免每次通知重新构造字符串）
+TITLE_CLIPBOARD = "📋 转录完成"
+TITLE_CORRECTED = "🤖 AI纠错完成"
+TITLE_ERROR = "❌ 操作失败"
+TITLE_WARNING = "⚠️ 录音时长警告"
+
+# 视为“纠错结果”的来源标签
+CORRECTION_TYPES = frozenset({"纠错", "纠错完成"})
+
+# 后台任务队列的停止标记
+_STOP = object()
+
+# 系统通知正文上限（系统通知本身也会截断）
+_SYSTEM_MESSAGE_LIMIT = 200
+
+
+def _osa_escape(text: str) -> str:
+    """转义为 AppleScript 双引号字符串内容（压成单行并限制长度）"""
+    text = text[:_SYSTEM_MESSAGE_LIMIT].replace('\\', '\\\\').replace('"', '\\"')
+    return text.replace('\r', ' ').replace('\n', ' ')
+
+
+# 各平台提示音播放命令，按 sound_type 查表
+_SOUND_COMMANDS = {
+    'macos': {
+        "copy": ['afplay', '/System/Library/Sounds/Tink.aiff'],
+        "success": ['afplay', '/System/Library/Sounds/Glass.aiff'],
+        "warning": ['afplay', '/System/Library/Sounds/Sosumi.aiff'],
+        "start_recording": ['afplay', '/System/Library/Sounds/Ping.aiff'],
+    },
+    'linux': {
+        "copy": ['paplay', '/usr/share/sounds/alsa/Front_Left.wav'],
+        "success": ['paplay', '/usr/share/sounds/alsa/Front_Right.wav'],
+        "warning": ['paplay', '/usr/share/sounds/alsa/Rear_Left.wav'],
+        "start_recording": ['paplay', '/usr/share/sounds/alsa/Side_Left.wav'],
+    },
+    'windows': {
+        "copy": ['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Ding.wav").PlaySync()'],
+        "success": ['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Notify.wav").PlaySync()'],
+        "warning": ['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Critical Stop.wav").PlaySync()'],
+        "start_recording": ['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Information Bar.wav").PlaySync()'],
+    },
+}
+
+
+def _ps_escape(text: str) -> str:
+    """转义为 PowerShell 双引号字符串内容（限制长度）"""
+    text = text[:_SYSTEM_MESSAGE_LIMIT].replace('`', '``').replace('"', '`"').replace('$', '`$')
+    return text.replace('\r', ' ').replace('\n', ' ')
+
 class NotificationManager:
     """通知管理器"""
     
     def __init__(self):
         """初始化通知管理器"""
-        self.platform = self._detect_platform()
+        self.platform = PLATFORM
+        # 平台相关实现在初始化时绑定一次，通知与提示音路径不再逐次判断平台
+        self._sound_commands = _SOUND_COMMANDS.get(self.platform, {})
+        self._system_notify_impl: Optional[Callable[[str, str], None]] = {
+            'macos': self._system_notify_macos,
+            'linux': self._system_notify_linux,
+            'windows': self._system_notify_windows,
+        }.get(self.platform)
+        # macOS 上预加载的系统音效，播放在进程内完成，无需每次启动 afplay
+        self._native_sounds: Dict[str, Any] = self._load_native_sounds() if self.platform == 'macos' else {}
         self.notification_enabled = True
         self.sound_enabled = True
         self.visual_enabled = True
+
+        # macOS 常驻的 osascript 交互进程，首次发送通知时启动
+        self._osa_process: Optional[subprocess.Popen] = None
+        self._osa_lock = threading.Lock()
+
+        # 系统通知与外部命令播放的提示音由常驻后台线程按提交顺序执行，不再每次新建线程
+        self._tasks: "queue.Queue[Any]" = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, name="NotificationWorker", daemon=True)
+        self._worker.start()
         
         # 检测系统通知支持
         self.system_notification_available = self._check_system_notification()
@@ -30,37 +105,14 @@ class NotificationManager:
             print(f"   平台: {self.platform}")
             print(f"   系统通知: {'✅' if self.system_notification_available else '❌'}")
     
-    def _detect_platform(self) -> str:
-        """检测操作系统平台"""
-        import platform
-        system = platform.system().lower()
-        if system == 'darwin':
-            return 'macos'
-        elif system == 'windows':
-            return 'windows' 
-        elif system == 'linux':
-            return 'linux'
-        else:
-            return 'unknown'
-    
     def _check_system_notification(self) -> bool:
-        """检查系统通知支持"""
+        """检查系统通知支持（只查找可执行文件，不再启动进程试发通知）"""
         if self.platform == 'macos':
-            # macOS 使用 osascript 显示通知
-            try:
-                subprocess.run(['osascript', '-e', 'display notification "test" with title "test"'], 
-                             capture_output=True, timeout=2, check=True)
-                return True
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
-                return False
+            # macOS 使用系统自带的 osascript 显示通知
+            return shutil.which('osascript') is not None
         elif self.platform == 'linux':
             # Linux 使用 notify-send
-            try:
-                subprocess.run(['notify-send', '--version'], 
-                             capture_output=True, timeout=2, check=True)
-                return True
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
-                return False
+            return shutil.which('notify-send') is not None
         elif self.platform == 'windows':
             # Windows 使用 PowerShell
             return True
@@ -79,12 +131,12 @@ class NotificationManager:
         display_text = text[:50] + "..." if len(text) > 50 else text
         
         # 根据类型设置不同的标题和图标
-        if correction_type == "纠错":
-            title = "🤖 AI纠错完成"
+        if correction_type in CORRECTION_TYPES:
+            title = TITLE_CORRECTED
             message = f"已更新剪贴板内容:\n{display_text}"
             self._play_success_sound()
         else:
-            title = "📋 转录完成"
+            title = TITLE_CLIPBOARD
             message = f"已复制到剪贴板:\n{display_text}"
             self._play_copy_sound()
         
@@ -93,38 +145,55 @@ class NotificationManager:
         
         # 显示系统通知
         if self.system_notification_available:
-            threading.Thread(
-                target=self._show_system_notification,
-                args=(title, message),
-                daemon=True
-            ).start()
+            self._submit(self._show_system_notification, title, message)
     
+    def _submit(self, func: Callable[..., None], *args: Any) -> None:
+        """提交后台任务（按 FIFO 顺序执行）"""
+        self._tasks.put((func, args))
+
+    def _worker_loop(self) -> None:
+        """后台线程：依次执行通知与提示音任务，直到收到停止标记"""
+        while True:
+            item = self._tasks.get()
+            if item is _STOP:
+                return
+            func, args = item
+            try:
+                func(*args)
+            except Exception as e:
+                if config.DEBUG_MODE:
+                    print(f"通知任务执行失败: {e}")
+
+    def close(self, timeout: float = 1.0) -> None:
+        """停止后台通知线程（已排队的任务执行完毕后退出）"""
+        if self._worker.is_alive():
+            self._tasks.put(_STOP)
+            self._worker.join(timeout=timeout)
+
     def _show_console_notification(self, title: str, message: str, full_text: str) -> None:
-        """显示增强的控制台通知"""
+        """显示增强的控制台通知（整块拼接后一次写出）"""
+        lines = message.split('\n')
         # 计算边框长度
-        max_len = max(len(title), max(len(line) for line in message.split('\n')))
+        max_len = max(len(title), *(len(line) for line in lines))
         border_len = min(max_len + 4, 60)
+        inner = border_len - 2
         border = "═" * border_len
         
-        print(f"\n┌{border}┐")
-        print(f"│ {title:^{border_len-2}} │")
-        print(f"├{border}┤")
+        out = [f"\n┌{border}┐", f"│ {title:^{inner}} │", f"├{border}┤"]
         
         # 分行显示消息
-        for line in message.split('\n'):
-            if line.strip():
-                print(f"│ {line:<{border_len-2}} │")
+        out.extend(f"│ {line:<{inner}} │" for line in lines if line.strip())
         
         # 显示字符数统计
-        char_count = len(full_text)
-        word_count = len(full_text.split())
-        stats = f"字符数: {char_count} | 词数: {word_count}"
-        print(f"├{border}┤")
-        print(f"│ {stats:<{border_len-2}} │")
+        stats = f"字符数: {len(full_text)} | 词数: {len(full_text.split())}"
+        out.append(f"├{border}┤")
+        out.append(f"│ {stats:<{inner}} │")
         
         # 操作提示
-        print(f"│ {'按 Cmd+V 粘贴使用':<{border_len-2}} │")
-        print(f"└{border}┘")
+        out.append(f"│ {'按 Cmd+V 粘贴使用':<{inner}} │")
+        out.append(f"└{border}┘\n")
+        sys.stdout.write("\n".join(out))
+        sys.stdout.flush()
         
         # 闪烁效果（可选）
         if config.DEBUG_MODE:
@@ -132,149 +201,150 @@ class NotificationManager:
     
     def _show_system_notification(self, title: str, message: str) -> None:
         """显示系统通知"""
+        if self._system_notify_impl is None:
+            return
         try:
-            if self.platform == 'macos':
-                # macOS 通知
-                script = f'''
-                display notification "{message}" with title "{title}" sound name "Glass"
-                '''
-                subprocess.run(['osascript', '-e', script], 
-                             capture_output=True, timeout=5)
-                             
-            elif self.platform == 'linux':
-                # Linux 通知
-                subprocess.run(['notify-send', title, message, '--icon=info', '--expire-time=3000'],
-                             capture_output=True, timeout=5)
-                             
-            elif self.platform == 'windows':
-                # Windows 通知
-                ps_script = f'''
-                [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
-                $template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02)
-                $xml = New-Object System.Xml.XmlDocument
-                $xml.LoadXml($template.GetXml())
-                $xml.GetElementsByTagName("text")[0].AppendChild($xml.CreateTextNode("{title}")) | Out-Null  
-                $xml.GetElementsByTagName("text")[1].AppendChild($xml.CreateTextNode("{message}")) | Out-Null
-                $toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
-                [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("Whisper-CLI").Show($toast)
-                '''
-                subprocess.run(['powershell', '-Command', ps_script],
-                             capture_output=True, timeout=5)
-                             
+            self._system_notify_impl(title, message)
         except Exception as e:
             if config.DEBUG_MODE:
                 print(f"系统通知发送失败: {e}")
-    
-    def _play_copy_sound(self) -> None:
-        """播放复制完成音效"""
+
+    def _system_notify_macos(self, title: str, message: str) -> None:
+        """macOS 通知（交互模式按行执行，转义后为单行）"""
+        script = (
+            f'display notification "{_osa_escape(message)}" '
+            f'with title "{_osa_escape(title)}" sound name "Glass"'
+        )
+        self._run_osascript(script)
+
+    def _system_notify_linux(self, title: str, message: str) -> None:
+        """Linux 通知"""
+        subprocess.run(['notify-send', title, message, '--icon=info', '--expire-time=3000'],
+                       capture_output=True, timeout=5)
+
+    def _system_notify_windows(self, title: str, message: str) -> None:
+        """Windows 通知"""
+        title = _ps_escape(title)
+        message = _ps_escape(message)
+        ps_script = f'''
+        [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
+        $template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02)
+        $xml = New-Object System.Xml.XmlDocument
+        $xml.LoadXml($template.GetXml())
+        $xml.GetElementsByTagName("text")[0].AppendChild($xml.CreateTextNode("{title}")) | Out-Null  
+        $xml.GetElementsByTagName("text")[1].AppendChild($xml.CreateTextNode("{message}")) | Out-Null
+        $toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
+        [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("Whisper-CLI").Show($toast)
+        '''
+        subprocess.run(['powershell', '-Command', ps_script],
+                       capture_output=True, timeout=5)
+
+    def _run_osascript(self, script: str) -> None:
+        """通过常驻 osascript -i 进程执行单行 AppleScript，避免每次通知都启动新进程"""
+        with self._osa_lock:
+            process = self._osa_process
+            if process is None or process.poll() is not None:
+                try:
+                    process = subprocess.Popen(
+                        ['osascript', '-i'],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                        encoding='utf-8',
+                    )
+                except OSError:
+                    process = None
+                self._osa_process = process
+            if process is not None:
+                try:
+                    process.stdin.write(script + "\n")
+                    process.stdin.flush()
+                    return
+                except (BrokenPipeError, OSError):
+                    self._osa_process = None
+        # 常驻进程不可用时退回一次性调用
+        subprocess.run(['osascript', '-e', script], capture_output=True, timeout=5)
+
+    def _load_native_sounds(self) -> Dict[str, Any]:
+        """通过 AppKit NSSound 预加载音效文件，AppKit 不可用时返回空表（回退 afplay）"""
+        try:
+            from AppKit import NSSound  # type: ignore
+        except Exception:
+            return {}
+        sounds: Dict[str, Any] = {}
+        for sound_type, command in self._sound_commands.items():
+            sound = NSSound.alloc().initWithContentsOfFile_byReference_(command[-1], True)
+            if sound is not None:
+                sounds[sound_type] = sound
+        return sounds
+
+    def _play_sound(self, sound_type: str) -> None:
+        """播放指定音效：优先使用预加载的原生音效，否则在后台线程中调用播放命令"""
         if not self.sound_enabled:
             return
-            
-        threading.Thread(target=self._play_sound_async, args=("copy",), daemon=True).start()
+
+        sound = self._native_sounds.get(sound_type)
+        if sound is not None:
+            try:
+                # NSSound.play 异步播放并立即返回；同一音效仍在播放时需先停止
+                sound.stop()
+                sound.play()
+                return
+            except Exception as e:
+                if config.DEBUG_MODE:
+                    print(f"音效播放失败: {e}")
+
+        self._submit(self._play_sound_async, sound_type)
+
+    def _play_copy_sound(self) -> None:
+        """播放复制完成音效"""
+        self._play_sound("copy")
     
     def _play_success_sound(self) -> None:
         """播放纠错成功音效"""
-        if not self.sound_enabled:
-            return
-            
-        threading.Thread(target=self._play_sound_async, args=("success",), daemon=True).start()
+        self._play_sound("success")
     
     def _play_warning_sound(self) -> None:
         """播放警告音效"""
-        if not self.sound_enabled:
-            return
-            
-        threading.Thread(target=self._play_sound_async, args=("warning",), daemon=True).start()
+        self._play_sound("warning")
     
     def _play_start_recording_sound(self) -> None:
         """播放录音开始音效"""
-        if not self.sound_enabled:
-            return
-            
-        threading.Thread(target=self._play_sound_async, args=("start_recording",), daemon=True).start()
+        self._play_sound("start_recording")
     
     def _play_sound_async(self, sound_type: str) -> None:
         """异步播放声音"""
+        command = self._sound_commands.get(sound_type)
+        if command is None:
+            return
         try:
-            if self.platform == 'macos':
-                if sound_type == "copy":
-                    # 播放系统复制音效
-                    subprocess.run(['afplay', '/System/Library/Sounds/Tink.aiff'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "success":
-                    # 播放系统成功音效
-                    subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "warning":
-                    # 播放系统警告音效
-                    subprocess.run(['afplay', '/System/Library/Sounds/Sosumi.aiff'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "start_recording":
-                    # 播放录音开始音效 - 使用较短的提示音
-                    subprocess.run(['afplay', '/System/Library/Sounds/Ping.aiff'], 
-                                 capture_output=True, timeout=3)
-            elif self.platform == 'linux':
-                # Linux 播放音效
-                if sound_type == "copy":
-                    subprocess.run(['paplay', '/usr/share/sounds/alsa/Front_Left.wav'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "success":
-                    subprocess.run(['paplay', '/usr/share/sounds/alsa/Front_Right.wav'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "warning":
-                    subprocess.run(['paplay', '/usr/share/sounds/alsa/Rear_Left.wav'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "start_recording":
-                    subprocess.run(['paplay', '/usr/share/sounds/alsa/Side_Left.wav'], 
-                                 capture_output=True, timeout=3)
-            elif self.platform == 'windows':
-                # Windows 播放音效
-                if sound_type == "copy":
-                    subprocess.run(['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Ding.wav").PlaySync()'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "success":
-                    subprocess.run(['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Notify.wav").PlaySync()'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "warning":
-                    subprocess.run(['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Critical Stop.wav").PlaySync()'], 
-                                 capture_output=True, timeout=3)
-                elif sound_type == "start_recording":
-                    subprocess.run(['powershell', '-c', '(New-Object Media.SoundPlayer "C:\\Windows\\Media\\Windows Information Bar.wav").PlaySync()'], 
-                                 capture_output=True, timeout=3)
+            subprocess.run(command, capture_output=True, timeout=3)
         except Exception as e:
             if config.DEBUG_MODE:
                 print(f"音效播放失败: {e}")
     
     def _create_visual_flash(self) -> None:
-        """创建视觉闪烁提示"""
+        """创建视觉提示（单行反显输出，不再循环 sleep 闪烁）"""
         if not self.visual_enabled:
             return
         
-        # 简单的控制台闪烁效果
-        for _ in range(3):
-            time.sleep(0.1)
-            print("\r" + " " * 80, end="", flush=True)  # 清空当前行
-            time.sleep(0.1)
-            print("\r🎉 剪贴板更新完成！", end="", flush=True)
-        print()  # 换行
+        sys.stdout.write("\x1b[7m🎉 剪贴板更新完成！\x1b[0m\n")
+        sys.stdout.flush()
     
     def show_error_notification(self, error_message: str) -> None:
         """显示错误通知"""
-        title = "❌ 操作失败"
+        title = TITLE_ERROR
         message = f"错误信息:\n{error_message}"
         
         self._show_console_notification(title, message, error_message)
         
         if self.system_notification_available:
-            threading.Thread(
-                target=self._show_system_notification,
-                args=(title, message),
-                daemon=True
-            ).start()
+            self._submit(self._show_system_notification, title, message)
     
     def show_warning_notification(self, warning_message: str) -> None:
         """显示警告通知"""
-        title = "⚠️ 录音时长警告"
+        title = TITLE_WARNING
         message = warning_message
         
         # 播放警告音效
@@ -285,11 +355,7 @@ class NotificationManager:
         
         # 显示系统通知
         if self.system_notification_available:
-            threading.Thread(
-                target=self._show_system_notification,
-                args=(title, message),
-                daemon=True
-            ).start()
+            self._submit(self._show_system_notification, title, message)
     
     def disable_notifications(self) -> None:
         """禁用所有通知"""
@@ -329,7 +395,6 @@ def notify_start_recording() -> None:
 # 测试代码
 if __name__ == "__main__":
     # 启用调试模式
-    import sys
     sys.path.append(str(Path(__file__).parent))
     
     manager = NotificationManager()
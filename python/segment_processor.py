@@ -16,7 +16,9 @@ import uuid
 from voice_activity_detector import VoiceSegment, VoiceActivityDetector
 from text_input_manager import TextInputManager, InputRequest, InputMethod, InputResult
 from service_registry import get_transcriber, get_corrector, get_dictionary
+from dictionary_manager import TranscriptSegment
 from timer_utils import Timer
+from clipboard_utils import copy_text
 import config
 
 
@@ -61,7 +63,13 @@ class SegmentProcessor:
         """初始化分段处理器"""
         # 核心组件
         self.transcriber = get_transcriber()
-        self.corrector = get_corrector()
+        # 未启用任何纠错时不创建纠错器（及其 API 客户端）；会话模式下主程序也复用该实例
+        correction_wanted = (
+            config.ENABLE_CORRECTION
+            or getattr(config, 'SEGMENT_ENABLE_CORRECTION', True)
+            or getattr(config, 'ENABLE_GEMINI_CORRECTION', False)
+        )
+        self.corrector = get_corrector() if correction_wanted else None
         self.dictionary_manager = get_dictionary()
         self.text_input_manager = TextInputManager()
         self.timer = Timer()
@@ -109,7 +117,7 @@ class SegmentProcessor:
         
         print(f"🔄 分段处理器初始化完成")
         print(f"   转录器就绪: {'✅' if self.transcriber.is_ready else '❌'}") 
-        print(f"   纠错器就绪: {'✅' if self.corrector.is_ready else '❌'}")
+        print(f"   纠错器就绪: {'✅' if self.corrector is not None and self.corrector.is_ready else '❌'}")
         print(f"   自动输出: {'✅' if self.enable_auto_output else '❌'}")
         if isinstance(self.output_method, InputMethod):
             print(f"   输出方法: {self.output_method.value}")
@@ -318,22 +326,16 @@ class SegmentProcessor:
             try:
                 processed_text = segment.raw_transcript or ""
 
-                if self.enable_dictionary and processed_text:
+                if self.enable_dictionary and processed_text and self.dictionary_manager.user_dict:
                     start_time = time.time()
                     transcript_data = [
-                        {
-                            'text': processed_text,
-                            'start': 0.0,
-                            'duration': segment.original_audio.duration,
-                        }
+                        TranscriptSegment(processed_text, duration=segment.original_audio.duration)
                     ]
                     processed_entries = self.dictionary_manager.process_transcript(transcript_data)
-                    merged_text = ""
-                    for entry in processed_entries:
-                        text = entry.get('text', '').strip()
-                        if text:
-                            merged_text += text + " "
-                    segment.processed_transcript = merged_text.strip() or processed_text
+                    merged_text = " ".join(
+                        text for entry in processed_entries if (text := entry.text.strip())
+                    )
+                    segment.processed_transcript = merged_text or processed_text
                     segment.processing_times['dictionary'] = time.time() - start_time
                     if config.DEBUG_MODE:
                         print(f"📚 [{worker_name}] 词典处理完成: {segment.segment_id}")
@@ -345,6 +347,7 @@ class SegmentProcessor:
                 if (
                     final_text
                     and self.enable_correction
+                    and self.corrector is not None
                     and self.corrector.is_ready
                     and config.GEMINI_MODEL != config.GEMINI_TRANSCRIPTION_MODEL
                 ):
@@ -415,13 +418,15 @@ class SegmentProcessor:
             
             if success:
                 print(f"✅ 文本已自动粘贴: '{text}'")
+            elif result == InputResult.PARTIAL:
+                # 开头部分已粘贴，剩余文本已在剪贴板中，不再覆盖为全文以免重复输入
+                print("⚠️ 文本仅部分粘贴，请按 Cmd+V 粘贴剩余内容")
             else:
                 print(f"❌ 自动粘贴失败: {result.value}")
                 print(f"💡 文本已复制到剪贴板，请手动按 Cmd+V 粘贴")
                 # 确保文本在剪贴板中
                 try:
-                    import pyperclip
-                    pyperclip.copy(text)
+                    copy_text(text)
                     print(f"📋 文本已备份到剪贴板: '{text}'")
                 except Exception as e:
                     print(f"⚠️ 剪贴板备份也失败了: {e}")
@@ -440,8 +445,7 @@ class SegmentProcessor:
             print(f"❌ 分段文本输出异常: {e}")
             # 异常情况下也要保证文本进入剪贴板
             try:
-                import pyperclip
-                pyperclip.copy(text)
+                copy_text(text)
                 print(f"📋 异常恢复: 文本已复制到剪贴板: '{text}'")
             except:
                 pass
@@ -539,18 +543,12 @@ class SegmentProcessor:
     
     def _generate_session_text(self, segments: List[ProcessedSegment]) -> str:
         """生成会话完整文本"""
-        full_text = ""
-        for segment in segments:
-            if segment.final_text:
-                full_text += segment.final_text + " "
-        
-        return full_text.strip()
+        return " ".join(segment.final_text for segment in segments if segment.final_text).strip()
     
     def _backup_session_to_clipboard(self, text: str):
         """将会话文本备份到剪贴板"""
         try:
-            import pyperclip
-            pyperclip.copy(text)
+            copy_text(text)
             print(f"📋 会话文本已备份到剪贴板 ({len(text)} 字符)")
         except Exception as e:
             print(f"⚠️ 剪贴板备份失败: {e}")
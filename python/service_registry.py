@@ -4,13 +4,15 @@ from __future__ import annotations
 
 import sys
 import threading
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from gemini_transcriber import GeminiTranscriber
-from gemini_corrector import GeminiCorrector
 from dictionary_manager import DictionaryManager
 import config
 
+if TYPE_CHECKING:  # 纠错器仅在首次获取时导入，未启用纠错时不加载
+    from gemini_corrector import GeminiCorrector
+
 
 class _ServiceRegistry:
     """简单的线程安全单例容器。"""
@@ -61,6 +63,8 @@ class _ServiceRegistry:
         with self._lock:
             if self._corrector is None:
                 try:
+                    from gemini_corrector import GeminiCorrector
+
                     self._corrector = GeminiCorrector()
                     if not self._corrector.is_ready:
                         error_msg = "Gemini 纠错器初始化失败：未就绪状态，请检查 GEMINI_API_KEY 配置"
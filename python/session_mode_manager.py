@@ -18,6 +18,8 @@ from audio_recorder import AudioRecorder
 from audio_retry_manager import audio_retry_manager
 from notification_utils import notification_manager
 from timer_utils import Timer
+from dictionary_manager import TranscriptSegment
+from clipboard_utils import copy_text
 import config
 
 
@@ -449,11 +451,10 @@ class SessionModeManager:
         print(f"✅ 分段处理完成: {segment.segment_id} ({len(segment.final_text)} 字符)")
         
         if config.DEBUG_MODE:
-            # 尝试安全地访问 transcription 属性
-            if hasattr(segment, 'transcription') and segment.transcription:
-                print(f"   原始转录: {segment.transcription}")
-            elif hasattr(segment, 'original_text') and segment.original_text:
-                print(f"   原始转录: {segment.original_text}")
+            # 分段类型不一定带 transcription 属性，每个属性只取一次
+            raw_text = getattr(segment, 'transcription', None) or getattr(segment, 'original_text', None)
+            if raw_text:
+                print(f"   原始转录: {raw_text}")
             print(f"   最终文本: {segment.final_text}")
     
     def _on_segment_output(self, segment, text=None):
@@ -509,15 +510,13 @@ class SessionModeManager:
         processed_transcript: Optional[str] = None
         corrected_transcript: Optional[str] = None
 
+        # 第一步：完整音频转录
+        self.timer.reset()
         try:
-            # 第一步：完整音频转录
-            self.timer.reset()
-            self.timer.start("batch_transcription")
-            raw_transcript = self.segment_processor.transcriber.transcribe_complete_audio(audio_data)
+            with self.timer.track("batch_transcription") as timing:
+                raw_transcript = self.segment_processor.transcriber.transcribe_complete_audio(audio_data)
         finally:
-            timing = self.timer.stop("batch_transcription")
-            if timing:
-                processing_times['transcription'] = timing.duration_ms / 1000.0
+            processing_times['transcription'] = timing.duration_ms / 1000.0
 
         if not raw_transcript:
             print("❌ 批量转录失败: 未获得转录文本")
@@ -526,43 +525,38 @@ class SessionModeManager:
         raw_transcript = raw_transcript.strip()
         processed_transcript = raw_transcript
 
-        # 第二步：词典处理
-        if self.config.enable_dictionary and self.segment_processor.enable_dictionary:
+        # 第二步：词典处理（用户词典为空时跳过）
+        if (self.config.enable_dictionary and self.segment_processor.enable_dictionary
+                and self.segment_processor.dictionary_manager.user_dict):
             try:
-                self.timer.start("batch_dictionary")
-                transcript_data = [{
-                    'text': raw_transcript,
-                    'start': 0.0,
-                    'duration': len(audio_data) / self.audio_recorder.sample_rate
-                }]
-                processed_entries = self.segment_processor.dictionary_manager.process_transcript(transcript_data)
-                merged_text = ""
-                for entry in processed_entries:
-                    text = entry.get('text', '').strip()
-                    if text:
-                        merged_text += text + " "
-                processed_transcript = merged_text.strip() or raw_transcript
+                with self.timer.track("batch_dictionary") as timing:
+                    transcript_data = [TranscriptSegment(
+                        raw_transcript,
+                        duration=len(audio_data) / self.audio_recorder.sample_rate,
+                    )]
+                    processed_entries = self.segment_processor.dictionary_manager.process_transcript(transcript_data)
+                    merged_text = " ".join(
+                        text for entry in processed_entries if (text := entry.text.strip())
+                    )
+                    processed_transcript = merged_text or raw_transcript
             finally:
-                timing = self.timer.stop("batch_dictionary")
-                if timing:
-                    processing_times['dictionary'] = timing.duration_ms / 1000.0
+                processing_times['dictionary'] = timing.duration_ms / 1000.0
 
         final_text = processed_transcript
 
         # 第三步：可选纠错
         if (self.config.enable_correction and self.segment_processor.enable_correction and
+                self.segment_processor.corrector is not None and
                 self.segment_processor.corrector.is_ready and
                 config.GEMINI_MODEL != config.GEMINI_TRANSCRIPTION_MODEL):
             try:
-                self.timer.start("batch_correction")
-                candidate = self.segment_processor.corrector.correct_transcript(processed_transcript)
-                if candidate and candidate.strip() and candidate.strip() != processed_transcript:
-                    corrected_transcript = candidate.strip()
-                    final_text = corrected_transcript
+                with self.timer.track("batch_correction") as timing:
+                    candidate = self.segment_processor.corrector.correct_transcript(processed_transcript)
+                    if candidate and candidate.strip() and candidate.strip() != processed_transcript:
+                        corrected_transcript = candidate.strip()
+                        final_text = corrected_transcript
             finally:
-                timing = self.timer.stop("batch_correction")
-                if timing:
-                    processing_times['correction'] = timing.duration_ms / 1000.0
+                processing_times['correction'] = timing.duration_ms / 1000.0
 
         info = {
             "task_id": self._current_batch_task_id,
@@ -627,8 +621,7 @@ class SessionModeManager:
 
         if config.ENABLE_CLIPBOARD:
             try:
-                import pyperclip
-                pyperclip.copy(final_text)
+                copy_text(final_text)
                 print("📋 文本已复制到剪贴板")
             except Exception as e:
                 print(f"⚠️ 剪贴板复制失败: {e}")
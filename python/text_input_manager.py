@@ -21,7 +21,7 @@ except ImportError:
     print("⚠️  pynput 未安装，文本输入功能将受限")
     print("   请运行: uv add pynput")
 
-import pyperclip
+from clipboard_utils import copy_text, paste_text
 import config
 
 
@@ -38,6 +38,7 @@ class InputResult(Enum):
     PERMISSION_DENIED = "permission_denied"
     METHOD_UNAVAILABLE = "method_unavailable"
     INPUT_CONFLICT = "input_conflict"
+    PARTIAL = "partial"              # 仅粘贴了开头部分，其余文本已放入剪贴板
     ERROR = "error"
 
 
@@ -69,6 +70,7 @@ class TextInputManager:
         self.input_delay = getattr(config, 'TEXT_INPUT_DELAY', 0.1)
         self.enable_clipboard_backup = getattr(config, 'TEXT_INPUT_CLIPBOARD_BACKUP', True)
         self.check_permissions_on_init = getattr(config, 'TEXT_INPUT_CHECK_PERMISSIONS', True)
+        self.paste_chunk_size = getattr(config, 'TEXT_INPUT_PASTE_CHUNK_SIZE', 16384)
         
         # 组件初始化
         self.keyboard_controller = None
@@ -188,7 +190,7 @@ class TextInputManager:
                 # 备份到剪贴板
                 if result == InputResult.SUCCESS and request.backup_to_clipboard and request.text:
                     try:
-                        pyperclip.copy(request.text)
+                        copy_text(request.text)
                         if config.DEBUG_MODE:
                             print(f"📋 文本已备份到剪贴板")
                     except Exception as e:
@@ -271,28 +273,42 @@ class TextInputManager:
         try:
             original_clipboard = ""
             try:
-                original_clipboard = pyperclip.paste()
+                original_clipboard = paste_text() or ""
             except Exception:
                 pass
 
-            pyperclip.copy(text)
-            time.sleep(0.15)
+            # 超长文本先粘贴开头一段让目标应用尽早响应，再一次性粘贴其余部分（最多两次粘贴）
+            chunk_size = self.paste_chunk_size
+            if 0 < chunk_size < len(text):
+                pieces = [text[:chunk_size], text[chunk_size:]]
+            else:
+                pieces = [text]
 
-            clipboard_content = pyperclip.paste()
-            if clipboard_content != text:
-                print(f"⚠️ 剪贴板验证失败，期望: '{text}', 实际: '{clipboard_content}'")
-                return InputResult.ERROR
-
-            if not self._perform_paste_shortcut():
-                print("⚠️ 粘贴快捷键触发失败，文本仍保留在剪贴板，需手动 Cmd+V")
-                return InputResult.INPUT_CONFLICT
+            pasted = 0
+            for piece in pieces:
+                result = self._paste_piece(piece)
+                if result == InputResult.SUCCESS:
+                    pasted += len(piece)
+                    continue
 
-            # 给予目标应用足够时间完成粘贴
-            time.sleep(0.35)
+                # 剪贴板上只有失败的这一段，改为放入尚未粘贴的全部文本供手动粘贴
+                remaining = text[pasted:]
+                if len(pieces) > 1:
+                    try:
+                        copy_text(remaining)
+                    except Exception:
+                        if config.DEBUG_MODE:
+                            print("⚠️ 写入剩余文本到剪贴板失败")
+                if pasted == 0:
+                    if result == InputResult.INPUT_CONFLICT:
+                        print("⚠️ 文本仍保留在剪贴板，需手动 Cmd+V")
+                    return result
+                print(f"⚠️ 已粘贴 {pasted} 字符，剩余 {len(remaining)} 字符已放入剪贴板，需手动 Cmd+V")
+                return InputResult.PARTIAL
 
             if original_clipboard:
                 try:
-                    pyperclip.copy(original_clipboard)
+                    copy_text(original_clipboard)
                 except Exception:
                     if config.DEBUG_MODE:
                         print("⚠️ 恢复原剪贴板内容失败，保持当前文本")
@@ -304,6 +320,24 @@ class TextInputManager:
             print(f"❌ 剪贴板粘贴失败: {e}")
             return InputResult.ERROR
 
+    def _paste_piece(self, piece: str) -> InputResult:
+        """写入剪贴板、校验后触发一次粘贴"""
+        copy_text(piece)
+        time.sleep(0.15)
+
+        clipboard_content = paste_text()
+        if clipboard_content != piece:
+            print(f"⚠️ 剪贴板验证失败，期望: '{piece}', 实际: '{clipboard_content}'")
+            return InputResult.ERROR
+
+        if not self._perform_paste_shortcut():
+            print("⚠️ 粘贴快捷键触发失败")
+            return InputResult.INPUT_CONFLICT
+
+        # 给予目标应用足够时间完成粘贴
+        time.sleep(0.35)
+        return InputResult.SUCCESS
+
     def _perform_paste_shortcut(self) -> bool:
         """尝试触发系统级 Cmd+V 粘贴"""
 
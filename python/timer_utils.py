@@ -4,11 +4,16 @@
 用于测量各个处理步骤的时间
 """
 
+import sys
 import time
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from contextlib import contextmanager
 
+# 摘要输出的分隔线，模块加载时构造一次
+_BORDER_EQUAL = "=" * 50
+_BORDER_LIGHT = "-" * 50
+
 @dataclass
 class TimingResult:
     """计时结果数据类"""
@@ -27,6 +32,8 @@ class Timer:
         """初始化计时器"""
         self.timings: Dict[str, TimingResult] = {}
         self.start_times: Dict[str, float] = {}
+        # 轻量阶段标记：仅追加 (标签, 时间点)，汇总时再按 <name>_start/<name>_end 配对
+        self._events: List[Tuple[str, float]] = []
     
     def start(self, name: str) -> None:
         """开始计时"""
@@ -54,6 +61,43 @@ class Timer:
         
         return result
     
+    def mark(self, label: str) -> float:
+        """记录阶段边界时间点，返回该时间点（perf_counter）"""
+        now = time.perf_counter()
+        self._events.append((label, now))
+        return now
+
+    def span_ms(self, name: str) -> Optional[float]:
+        """返回最近一对 <name>_start/<name>_end 标记之间的耗时（毫秒）"""
+        start_label, end_label = f"{name}_start", f"{name}_end"
+        end_time = None
+        for label, ts in reversed(self._events):
+            if end_time is None:
+                if label == end_label:
+                    end_time = ts
+            elif label == start_label:
+                return (end_time - ts) * 1000
+        return None
+
+    def _mark_timings(self) -> Dict[str, TimingResult]:
+        """将成对标记还原为 TimingResult（仅在汇总时调用）"""
+        results: Dict[str, TimingResult] = {}
+        open_marks: Dict[str, float] = {}
+        for label, ts in self._events:
+            if label.endswith("_start"):
+                open_marks[label[:-6]] = ts
+            elif label.endswith("_end"):
+                name = label[:-4]
+                start_time = open_marks.pop(name, None)
+                if start_time is not None:
+                    results[name] = TimingResult(
+                        name=name,
+                        start_time=start_time,
+                        end_time=ts,
+                        duration_ms=(ts - start_time) * 1000,
+                    )
+        return results
+
     @contextmanager
     def measure(self, name: str):
         """上下文管理器方式计时"""
@@ -65,43 +109,66 @@ class Timer:
             if result:
                 print(f"⏱️  {result}")
     
+    @contextmanager
+    def track(self, name: str) -> Iterator[TimingResult]:
+        """上下文管理器方式计时（静默）：不经过 start_times，退出时一次性写入结果
+
+        产出的 TimingResult 在 with 块结束后填好 end_time/duration_ms，可直接读取
+        """
+        result = TimingResult(name=name, start_time=time.perf_counter(), end_time=0.0, duration_ms=0.0)
+        try:
+            yield result
+        finally:
+            result.end_time = time.perf_counter()
+            result.duration_ms = (result.end_time - result.start_time) * 1000
+            self.timings[name] = result
+
     def get_timing(self, name: str) -> Optional[TimingResult]:
         """获取指定计时结果"""
-        return self.timings.get(name)
+        result = self.timings.get(name)
+        if result is None and self._events:
+            result = self._mark_timings().get(name)
+        return result
     
     def get_all_timings(self) -> Dict[str, TimingResult]:
-        """获取所有计时结果"""
-        return self.timings.copy()
+        """获取所有计时结果（含成对标记）"""
+        timings = self.timings.copy()
+        if self._events:
+            timings.update(self._mark_timings())
+        return timings
     
     def print_summary(self, title: str = "计时统计") -> None:
         """打印计时统计摘要"""
-        if not self.timings:
+        timings = self.get_all_timings()
+        if not timings:
             print(f"📊 {title}: 暂无数据")
             return
         
-        print(f"\n📊 {title}")
-        print("=" * 50)
+        lines = [f"\n📊 {title}", _BORDER_EQUAL]
         
         total_time = 0.0
         total_session = None
-        for name, timing in self.timings.items():
-            print(f"  {timing}")
+        for name, timing in timings.items():
+            lines.append(f"  {timing}")
             if name == "total_session":
                 total_session = timing.duration_ms
             else:
                 total_time += timing.duration_ms
 
-        print("-" * 50)
+        lines.append(_BORDER_LIGHT)
         if total_time:
-            print(f"  阶段合计: {total_time:.1f}ms ({total_time/1000:.2f}s)")
+            lines.append(f"  阶段合计: {total_time:.1f}ms ({total_time/1000:.2f}s)")
         if total_session is not None:
-            print(f"  总耗时: {total_session:.1f}ms ({total_session/1000:.2f}s)")
-        print("=" * 50)
+            lines.append(f"  总耗时: {total_session:.1f}ms ({total_session/1000:.2f}s)")
+        lines.append(_BORDER_EQUAL)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     def reset(self) -> None:
         """重置所有计时数据"""
         self.timings.clear()
         self.start_times.clear()
+        self._events.clear()
     
     def format_duration(self, duration_ms: float) -> str:
         """格式化时间显示"""
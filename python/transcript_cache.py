@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+转录结果缓存模块
+以录音 int16 数据的 SHA-256 为键，持久化保存 Gemini 转录与纠错结果，
+重新处理同一段已保存的音频（如回放调试录音、回归样本）时直接复用，省去 API 调用；
+结果只在转录成功后写入，失败后的重试不会命中
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+import config
+
+
+class TranscriptCache:
+    """基于 sqlite3 的转录结果缓存（按最近使用时间淘汰）"""
+
+    def __init__(self, db_path: Optional[Path] = None, max_entries: Optional[int] = None):
+        """初始化缓存（数据库在首次访问时才打开）"""
+        self.db_path = Path(db_path or getattr(
+            config, "TRANSCRIPT_CACHE_FILE", Path(config.PROJECT_ROOT) / "logs" / "tx_cache.db"
+        ))
+        self.max_entries = max_entries or getattr(config, "TRANSCRIPT_CACHE_MAX_ENTRIES", 1000)
+        self.enabled = getattr(config, "ENABLE_TRANSCRIPT_CACHE", True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def make_key(audio_data: np.ndarray) -> bytes:
+        """计算音频数据的 SHA-256 摘要作为缓存键"""
+        return hashlib.sha256(memoryview(np.ascontiguousarray(audio_data))).digest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开数据库并建表，失败时禁用缓存"""
+        if self._conn is not None or not self.enabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "audio_sha256 BLOB PRIMARY KEY, "
+                "transcript TEXT NOT NULL, "
+                "corrected TEXT, "
+                "created_at REAL NOT NULL, "
+                "last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON transcripts (last_used)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as exc:
+            print(f"⚠️ 转录缓存不可用，已禁用: {exc}")
+            self.enabled = False
+        return self._conn
+
+    def get(self, key: bytes) -> Optional[Tuple[str, Optional[str]]]:
+        """查询缓存，命中时返回 (转录文本, 纠错文本)"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT transcript, corrected FROM transcripts WHERE audio_sha256 = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE transcripts SET last_used = ? WHERE audio_sha256 = ?",
+                    (time.time(), key),
+                )
+                conn.commit()
+                return row[0], row[1]
+            except sqlite3.Error as exc:
+                if config.DEBUG_MODE:
+                    print(f"⚠️ 读取转录缓存失败: {exc}")
+                return None
+
+    def put(self, key: bytes, transcript: str, corrected: Optional[str] = None) -> None:
+        """写入缓存，并淘汰超出上限的最久未使用记录"""
+        if not transcript:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            now = time.time()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts "
+                    "(audio_sha256, transcript, corrected, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, transcript, corrected, now, now),
+                )
+                conn.execute(
+                    "DELETE FROM transcripts WHERE audio_sha256 NOT IN ("
+                    "SELECT audio_sha256 FROM transcripts ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+            except sqlite3.Error as exc:
+                if config.DEBUG_MODE:
+                    print(f"⚠️ 写入转录缓存失败: {exc}")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 全局缓存实例
+transcript_cache = TranscriptCache()